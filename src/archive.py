@@ -0,0 +1,205 @@
+"""
+Build output streamed straight into a tar, tar.gz or zip archive.
+
+ArchiveOutput has the same interface as output.OutputTree, so static
+files and rendered pages are added as they are produced instead of being
+written to a directory and archived afterwards. Entries get fixed
+timestamps, owners and permissions, and callers add them in a stable
+order, so the same inputs always produce byte-identical archives.
+"""
+
+import hashlib
+import io
+import os
+import posixpath
+
+# 1980-01-01T00:00:00Z, the earliest time a zip entry can carry. Override
+# with SOURCE_DATE_EPOCH as usual for reproducible builds.
+DEFAULT_MTIME = 315532800
+
+FORMATS = ("tar", "tar.gz", "zip")
+
+# Already-compressed formats are stored as-is in zips
+STORED_EXTENSIONS = frozenset(
+    ".png .jpg .jpeg .gif .webp .avif .woff .woff2 .gz .tgz .br .zst .zip .mp3 .mp4 .webm .ogg".split()
+)
+
+
+def archive_format(path):
+    """Archive format implied by `path`'s extension."""
+    name = path.lower()
+    if name.endswith((".tar.gz", ".tgz")):
+        return "tar.gz"
+    if name.endswith(".tar"):
+        return "tar"
+    if name.endswith(".zip"):
+        return "zip"
+    raise ValueError(f"can't tell the archive format of {path}; use .tar, .tar.gz, .tgz or .zip")
+
+
+def _source_date_epoch():
+    value = os.environ.get("SOURCE_DATE_EPOCH")
+    return max(int(value), DEFAULT_MTIME) if value else DEFAULT_MTIME
+
+
+class ArchiveOutput:
+    """
+    Build outputs streamed into the archive at `path`. The archive is
+    written to a temporary file and only renamed into place by close(),
+    so a failed build never leaves a truncated archive behind.
+
+    Args:
+        path: Archive file to create.
+        fmt: "tar", "tar.gz" or "zip"; derived from `path` if omitted.
+        manifest: {relative path: sha256} of the previous archive, used
+            only to compute the deploy diff.
+    """
+
+    format = "archive"
+    previous = None
+    in_place = False
+
+    def __init__(self, path, fmt=None, manifest=None):
+        self.path = path
+        self.root = os.path.abspath(path)
+        self.fmt = fmt or archive_format(path)
+        if self.fmt not in FORMATS:
+            raise ValueError(f"unknown archive format: {self.fmt}")
+        self.old = manifest or {}
+        self.files = {}
+        self.written = 0
+        self.kept = 0
+        self.mtime = _source_date_epoch()
+
+        directory = os.path.dirname(self.root)
+        os.makedirs(directory, exist_ok=True)
+        self._tmp = f"{self.root}.tmp-{os.getpid()}"
+        self._file = open(self._tmp, "wb")
+        self._gzip = None
+        if self.fmt == "zip":
+            import zipfile
+
+            self._zip = zipfile.ZipFile(self._file, "w")
+        else:
+            import tarfile
+
+            stream = self._file
+            if self.fmt == "tar.gz":
+                import gzip
+
+                # No file name and a zero mtime in the gzip header
+                self._gzip = gzip.GzipFile(filename="", mode="wb", fileobj=self._file, mtime=0)
+                stream = self._gzip
+            self._tar = tarfile.open(fileobj=stream, mode="w|", format=tarfile.PAX_FORMAT)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def relpath(self, path):
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def _zip_info(self, name):
+        import time
+        import zipfile
+
+        info = zipfile.ZipInfo(name, time.gmtime(self.mtime)[:6])
+        info.create_system = 3  # unix, so external_attr holds a mode
+        return info
+
+    def _tar_info(self, name):
+        import tarfile
+
+        info = tarfile.TarInfo(name)
+        info.mtime = self.mtime
+        info.uid = info.gid = 0
+        info.uname = info.gname = ""
+        return info
+
+    def mkdir(self, path):
+        rel = self.relpath(path)
+        if rel == ".":
+            return
+        if self.fmt == "zip":
+            info = self._zip_info(rel + "/")
+            info.external_attr = (0o40755 << 16) | 0x10
+            self._zip.writestr(info, b"")
+        else:
+            import tarfile
+
+            info = self._tar_info(rel)
+            info.type = tarfile.DIRTYPE
+            info.mode = 0o755
+            self._tar.addfile(info)
+
+    def write_bytes(self, path, data):
+        """Add `data` to the archive as `path`. Always returns True."""
+        rel = self.relpath(path)
+        if rel in self.files:
+            raise ValueError(f"{rel} was already added to {self.path}")
+        self.files[rel] = hashlib.sha256(data).hexdigest()
+        if self.fmt == "zip":
+            import zipfile
+
+            info = self._zip_info(rel)
+            info.external_attr = 0o100644 << 16
+            stored = posixpath.splitext(rel)[1].lower() in STORED_EXTENSIONS
+            info.compress_type = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+            self._zip.writestr(info, data)
+        else:
+            info = self._tar_info(rel)
+            info.size = len(data)
+            info.mode = 0o644
+            self._tar.addfile(info, io.BytesIO(data))
+        self.written += 1
+        return True
+
+    def write_text(self, path, text):
+        return self.write_bytes(path, text.encode("utf-8"))
+
+    def copy(self, src, path):
+        with open(src, "rb") as f:
+            data = f.read()
+        return self.write_bytes(path, data)
+
+    def reuse(self, path):
+        """Archives are always written whole; nothing can be reused."""
+        return False
+
+    def manifest(self):
+        return dict(self.files)
+
+    def diff(self):
+        """Paths added, changed and removed relative to the previous archive."""
+        added = sorted(rel for rel in self.files if rel not in self.old)
+        changed = sorted(rel for rel, digest in self.files.items() if rel in self.old and self.old[rel] != digest)
+        removed = sorted(rel for rel in self.old if rel not in self.files)
+        return {"added": added, "changed": changed, "removed": removed}
+
+    def _finish(self):
+        if self.fmt == "zip":
+            self._zip.close()
+        else:
+            self._tar.close()
+            if self._gzip is not None:
+                self._gzip.close()
+        self._file.close()
+
+    def close(self):
+        """Finish the archive and move it into place."""
+        self._finish()
+        os.replace(self._tmp, self.root)
+
+    def abort(self):
+        """Drop the partially written archive."""
+        try:
+            self._finish()
+        finally:
+            if os.path.exists(self._tmp):
+                os.remove(self._tmp)
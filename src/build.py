@@ -0,0 +1,424 @@
+import os
+import posixpath
+import sys
+from urllib.parse import unquote, urlparse
+
+from copystatic import copy_static_to_public
+from defaults import DEFAULT_CACHE_DIR
+from output import OutputTree, load_manifest, save_json
+from publish import (
+    DEFAULT_KEEP,
+    begin_generation,
+    clone_generation,
+    commit_generation,
+    current_generation,
+    discard_generation,
+    manifest_path,
+)
+
+
+DIFF_FILE = "deploy-diff.json"
+
+# Local URLs with these extensions point at pages, not static assets
+_PAGE_EXTENSIONS = ("", ".html", ".htm")
+
+
+def output_path(page_rel):
+    """Output path, relative to the site root, for a content-relative page."""
+    return page_rel[: -len(".md")] + ".html"
+
+
+def resolve_asset(url, page_rel, static):
+    """
+    Map a URL referenced by `page_rel` to the file under `static` it would
+    be served from, or None for external URLs and links to other pages.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme or parsed.netloc or not parsed.path:
+        return None
+    path = unquote(parsed.path)
+    if path.startswith("/"):
+        rel = path.lstrip("/")
+    else:
+        rel = posixpath.join(posixpath.dirname(page_rel), path)
+    rel = posixpath.normpath(rel)
+    if rel.startswith("..") or posixpath.splitext(rel)[1].lower() in _PAGE_EXTENSIONS:
+        return None
+    return os.path.join(static, *rel.split("/"))
+
+
+def _critical_css(static, inline_css):
+    if not inline_css:
+        return None
+    from css import CriticalCSS
+
+    return CriticalCSS(static)
+
+
+def _build_pages(static, content, template, out, minify, drafts, cache_dir, full, memory=None, workers=1, css=None):
+    """
+    Render the site's pages into the OutputTree `out`. Pages whose recorded
+    inputs (source, template, partials, referenced assets) are all
+    unchanged are reused from the previous generation instead of being
+    re-rendered. `memory` is an optional MemoryTracker for page renders and
+    `workers` the process count for building large pages' blocks. `css` is
+    an optional css.CriticalCSS inlining each page's stylesheet rules.
+
+    Returns:
+        int: bytes saved by minification.
+    """
+    from depindex import INDEX_FILE as DEPS_FILE
+    from depindex import DependencyIndex
+    from gencontent import generate_page
+    from pageindex import INDEX_FILE, PageIndex
+
+    index = PageIndex.load(os.path.join(cache_dir, INDEX_FILE))
+    index.scan(content)
+    selected = [rel for rel, _ in index.pages(include_drafts=drafts)]
+
+    deps = DependencyIndex.load(os.path.join(cache_dir, DEPS_FILE))
+    options = {
+        "static": static,
+        "content": content,
+        "template": template,
+        "minify": minify,
+        "format": out.format,
+        "inline_css": css is not None,
+    }
+    # Outputs are reused from out.previous, so the index only holds for
+    # the generation it was written for; after a rollback it doesn't.
+    recorded = dict(deps.options or {})
+    generation = recorded.pop("generation", None)
+    if full or out.previous is None or recorded != options or generation != os.path.basename(out.previous):
+        stale = set(selected)
+    else:
+        stale = deps.affected_pages(deps.changed_inputs())
+        stale.update(rel for rel in selected if rel not in deps.pages)
+
+    saved = 0
+    reused = 0
+    for rel in selected:
+        dest_path = os.path.join(out.root, output_path(rel))
+        if rel not in stale and out.reuse(dest_path):
+            reused += 1
+            continue
+
+        from_path = os.path.join(content, rel)
+        page_deps = {}
+        saved += generate_page(from_path, template, dest_path, minify, page_deps, out.write_text, memory, workers, css)
+        inputs = [from_path] + page_deps["templates"]
+        for url in page_deps["assets"]:
+            asset = resolve_asset(url, rel, static)
+            if asset is not None:
+                inputs.append(asset)
+        deps.record(rel, inputs)
+        deps.refresh(inputs)
+
+    kept = set(selected)
+    for rel in list(deps.pages):
+        if rel not in kept:
+            deps.remove(rel)
+    deps.options = {**options, "generation": os.path.basename(out.root)}
+    deps.save()
+    index.save()
+    print(f"Rendered {len(selected) - reused} pages, reused {reused} unchanged")
+    return saved
+
+
+def build_site(
+    static,
+    content,
+    template,
+    dest,
+    minify=False,
+    keep=DEFAULT_KEEP,
+    pages=True,
+    drafts=False,
+    cache_dir=DEFAULT_CACHE_DIR,
+    full=False,
+    diff_path=None,
+    memory=None,
+    workers=1,
+    minify_css=False,
+    inline_css=False,
+):
+    """
+    Build the site into a fresh generation and atomically publish it as
+    `dest`. Nothing under `dest` changes until the whole build succeeded.
+
+    Pages are chosen from the persisted metadata index, so drafts are
+    dropped before any page body is read, and only pages whose inputs
+    changed are re-rendered unless `full` is set.
+
+    Output files whose bytes match the previous generation's manifest are
+    hard-linked rather than rewritten, keeping their mtimes. The added,
+    changed and removed paths are written to `diff_path` (by default
+    deploy-diff.json in the cache directory) for deploy tooling.
+
+    If `memory` is a MemoryTracker, each page render's peak memory is
+    recorded and checked against its budget. With `workers` > 1, the
+    blocks of large pages are built across that many processes.
+
+    `minify_css` minifies stylesheets as they are copied from `static`;
+    `inline_css` replaces each page's local stylesheet links with the
+    rules that page can use (see css.CriticalCSS).
+
+    Returns:
+        threading.Thread: the background pruning of old generations.
+    """
+    previous = current_generation(dest)
+    staging = begin_generation(dest)
+    manifest = load_manifest(manifest_path(previous)) if previous else {}
+    out = OutputTree(staging, previous, manifest)
+    try:
+        copy_static_to_public(static, staging, out, minify_css)
+        if pages:
+            if os.path.isdir(content):
+                css = _critical_css(static, inline_css)
+                saved = _build_pages(
+                    static, content, template, out, minify, drafts, cache_dir, full, memory, workers, css
+                )
+                if minify:
+                    print(f"Minification saved {saved} bytes in total")
+            else:
+                print(f"No content directory: {content}")
+        save_json(manifest_path(staging), {"files": out.manifest()})
+    except BaseException:
+        discard_generation(staging)
+        raise
+    _write_diff(out, os.path.basename(staging), diff_path or os.path.join(cache_dir, DIFF_FILE))
+    return commit_generation(dest, staging, keep)
+
+
+def build_archive(
+    static,
+    content,
+    template,
+    archive,
+    minify=False,
+    drafts=False,
+    cache_dir=DEFAULT_CACHE_DIR,
+    diff_path=None,
+    memory=None,
+    workers=1,
+    fmt=None,
+    minify_css=False,
+    inline_css=False,
+):
+    """
+    Build the whole site straight into a tar, tar.gz or zip file at
+    `archive` (format from `fmt` or the file extension) instead of a
+    directory. Static files go in first, in sorted order, then pages in
+    path order; entries carry fixed timestamps, so unchanged inputs give a
+    byte-identical archive. Nothing is published under `dest`.
+
+    The archive's manifest is kept in the cache directory so a deploy diff
+    against the previous archive is written as for directory builds.
+    The other options are as for build_site.
+
+    Returns:
+        str: the archive path.
+    """
+    from archive import ArchiveOutput
+
+    manifest_file = os.path.join(cache_dir, f"{os.path.basename(archive)}.manifest.json")
+    with ArchiveOutput(archive, fmt, load_manifest(manifest_file)) as out:
+        copy_static_to_public(static, out.root, out, minify_css)
+        if os.path.isdir(content):
+            css = _critical_css(static, inline_css)
+            saved = _build_pages(static, content, template, out, minify, drafts, cache_dir, True, memory, workers, css)
+            if minify:
+                print(f"Minification saved {saved} bytes in total")
+        else:
+            print(f"No content directory: {content}")
+    save_json(manifest_file, {"files": out.manifest()})
+    _write_diff(out, os.path.basename(archive), diff_path or os.path.join(cache_dir, DIFF_FILE))
+    print(f"Wrote {out.fmt} archive {archive}")
+    return archive
+
+
+def _write_diff(out, generation, diff_path):
+    diff = out.diff()
+    save_json(diff_path, {"generation": generation, **diff})
+    print(
+        f"Wrote {out.written} files, kept {out.kept} unchanged; "
+        f"{len(diff['added'])} added, {len(diff['changed'])} changed, "
+        f"{len(diff['removed'])} removed (see {diff_path})"
+    )
+
+
+_GLOB_CHARS = frozenset("*?[")
+
+
+def _selector_pattern(selector):
+    """
+    Compile a page selector into a regex over content-relative paths.
+    `**` crosses directories, `*` and `?` don't. A selector matches a page
+    by its source path (`a/b.md`), output path (`a/b.html`) or bare stem.
+    """
+    import re
+
+    for suffix in (".md", ".html"):
+        if selector.endswith(suffix):
+            selector = selector[: -len(suffix)]
+    parts = []
+    i = 0
+    while i < len(selector):
+        if selector.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif selector[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif selector[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        else:
+            parts.append(re.escape(selector[i]))
+            i += 1
+    return re.compile("".join(parts) + r"(?:\.md|\.html)?")
+
+
+def _selector_base(selector):
+    """Leading directory segments of `selector` that contain no glob syntax."""
+    segments = selector.split("/")
+    base = []
+    for segment in segments[:-1]:
+        if _GLOB_CHARS.intersection(segment):
+            break
+        base.append(segment)
+    return "/".join(base)
+
+
+def select_pages(content, selectors, drafts=False):
+    """
+    Markdown pages under `content` matching any of `selectors`, relative
+    to `content`. Only the literal directory prefix of each selector is
+    walked, so the cost follows the selection rather than the site size.
+    A selector naming a directory selects everything beneath it.
+    """
+    from frontmatter import is_draft, read_header
+
+    selected = set()
+    for selector in selectors:
+        selector = selector.strip("/")
+        if ".." in selector.split("/"):
+            raise ValueError(f"selector {selector!r} reaches outside {content}")
+        if not _GLOB_CHARS.intersection(selector) and os.path.isdir(os.path.join(content, selector)):
+            selector = f"{selector}/**" if selector else "**"
+        pattern = _selector_pattern(selector)
+        base = _selector_base(selector)
+        root = os.path.join(content, base) if base else content
+        if not os.path.isdir(root):
+            continue
+
+        stack = [root]
+        while stack:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        stack.append(entry.path)
+                    elif entry.name.endswith(".md"):
+                        rel = os.path.relpath(entry.path, content).replace(os.sep, "/")
+                        if pattern.fullmatch(rel) or pattern.fullmatch(rel[: -len(".md")]):
+                            selected.add(rel)
+    if drafts:
+        return sorted(selected)
+    pages = []
+    for rel in sorted(selected):
+        try:
+            meta = read_header(os.path.join(content, rel))
+        except ValueError as e:
+            print(f"Skipping {rel}: {e}", file=sys.stderr)
+            continue
+        if not is_draft(meta):
+            pages.append(rel)
+    return pages
+
+
+def build_selection(
+    selectors,
+    static,
+    content,
+    template,
+    dest,
+    minify=False,
+    drafts=False,
+    cache_dir=DEFAULT_CACHE_DIR,
+    diff_path=None,
+    memory=None,
+    workers=1,
+    minify_css=False,
+    inline_css=False,
+    keep=DEFAULT_KEEP,
+):
+    """
+    Re-render only the pages matching `selectors`, plus the static assets
+    they reference. The live site is cloned into a new generation with
+    hard links, the selection is rendered over the clone, and the result
+    is published with the usual symlink swap, so `rollback` returns to the
+    site as it was before. Everything outside the selection is carried
+    over byte for byte. Old generations are pruned before returning.
+
+    The selected pages are dropped from the dependency index, so the next
+    full build re-renders them and reuses everything else from this
+    generation. A deploy diff is written as usual. `memory`, `workers`,
+    `minify_css`, `inline_css` and `keep` are as for build_site.
+
+    Returns:
+        list: the content-relative pages that were rendered.
+    """
+    from depindex import INDEX_FILE as DEPS_FILE
+    from depindex import DependencyIndex
+    from gencontent import generate_page
+
+    live = current_generation(dest) or (dest if os.path.isdir(dest) else None)
+    if live is None:
+        raise ValueError(f"nothing published at {dest}; run a full build first")
+    pages = select_pages(content, selectors, drafts)
+
+    staging = begin_generation(dest)
+    manifest = load_manifest(manifest_path(live)) if live != dest else {}
+    try:
+        clone_generation(live, staging)
+        # The clone holds the live files, so write over it like a live tree
+        out = OutputTree(staging, manifest=manifest, in_place=True)
+        css = _critical_css(static, inline_css)
+        assets = set()
+        for rel in pages:
+            page_deps = {}
+            dest_path = os.path.join(staging, output_path(rel))
+            from_path = os.path.join(content, rel)
+            generate_page(from_path, template, dest_path, minify, page_deps, out.write_text, memory, workers, css)
+            for url in page_deps["assets"]:
+                asset = resolve_asset(url, rel, static)
+                if asset is not None and os.path.isfile(asset):
+                    assets.add(asset)
+
+        for asset in sorted(assets):
+            target = os.path.join(staging, os.path.relpath(asset, static))
+            if minify_css and asset.lower().endswith(".css"):
+                from css import minify_file
+
+                if out.write_text(target, minify_file(asset)):
+                    print(f"Minified file: {asset} → {target}")
+            elif out.copy(asset, target):
+                print(f"Copied file: {asset} → {target}")
+        print(f"Rendered {len(pages)} selected pages and {len(assets)} assets")
+        save_json(manifest_path(staging), {"files": out.manifest()})
+    except BaseException:
+        discard_generation(staging)
+        raise
+
+    # Keep the dependency index valid for the new generation when it was
+    # valid for the old one
+    deps = DependencyIndex.load(os.path.join(cache_dir, DEPS_FILE))
+    if deps.options and deps.options.get("generation") == os.path.basename(live):
+        for rel in pages:
+            deps.remove(rel)
+        deps.options = {**deps.options, "generation": os.path.basename(staging)}
+        deps.save()
+
+    _write_diff(out, os.path.basename(staging), diff_path or os.path.join(cache_dir, DIFF_FILE))
+    commit_generation(dest, staging, keep, background=False)
+    return pages
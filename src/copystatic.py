@@ -1,29 +1,80 @@
 import os
 import shutil
 
-def copy_static_to_public(src="static", dest="public") -> None:
+def copy_static_to_public(src="static", dest="public", output=None, minify_css=False) -> None:
     """
     Copies all files from the source directory to the destination directory.
     If the destination directory exists, it will be removed before copying.
+
+    When an output.OutputTree (or archive.ArchiveOutput) is given, files
+    and directories are created through it, so unchanged files are carried
+    over from the previous generation or streamed into an archive, and
+    items are visited in sorted name order so outputs are reproducible.
+
+    With `minify_css`, .css files are minified on the way.
+
+    Directories are walked with an explicit stack instead of recursion, so
+    deeply nested trees don't hit the recursion limit. Items are still
+    visited depth-first, in os.listdir order when there is no output.
     """
 
-    # Remove destination directory if it exists
-    if os.path.exists(dest):
-        print(f"Removing existing directory: {dest}")
-        shutil.rmtree(dest)
-    
-    # Create destination directory
-    os.mkdir(dest)
-
-    # Walk through source directory
-    for item in os.listdir(src):
-        src_path = os.path.join(src, item)
-        dest_path = os.path.join(dest, item)
+    def listing(path):
+        names = os.listdir(path)
+        return sorted(names) if output is not None else names
+
+    if output is not None:
+        output.mkdir(dest)
+    else:
+        # Remove destination directory if it exists; a published site is a
+        # symlink into its generations, and only the link is removed
+        if os.path.islink(dest):
+            print(f"Removing existing link: {dest}")
+            os.remove(dest)
+        elif os.path.exists(dest):
+            print(f"Removing existing directory: {dest}")
+            shutil.rmtree(dest)
+
+        # Create destination directory
+        os.mkdir(dest)
+
+    # Pending (src_path, dest_path) pairs; listings are pushed in reverse
+    # so they pop in listing order
+    stack = [(os.path.join(src, item), os.path.join(dest, item)) for item in reversed(listing(src))]
+
+    while stack:
+        src_path, dest_path = stack.pop()
         
         if os.path.isfile(src_path):
-            shutil.copy(src_path, dest_path)
-            print(f"Copied file: {src_path} → {dest_path}")
+            if minify_css and src_path.lower().endswith(".css"):
+                from css import minify_file
+
+                text = minify_file(src_path)
+                if output is None:
+                    with open(dest_path, "w", encoding="utf-8") as f:
+                        f.write(text)
+                    print(f"Minified file: {src_path} → {dest_path}")
+                elif output.write_text(dest_path, text):
+                    print(f"Minified file: {src_path} → {dest_path}")
+                else:
+                    print(f"Unchanged file: {src_path} → {dest_path}")
+            elif output is None:
+                shutil.copy(src_path, dest_path)
+                print(f"Copied file: {src_path} → {dest_path}")
+            elif output.copy(src_path, dest_path):
+                print(f"Copied file: {src_path} → {dest_path}")
+            else:
+                print(f"Unchanged file: {src_path} → {dest_path}")
         else:
-            # Recursively copy subdirectory
+            # Descend into subdirectory
             print(f"Entering directory: {src_path}")
-            copy_static_to_public(src_path, dest_path)
+            if output is not None:
+                output.mkdir(dest_path)
+            else:
+                if os.path.exists(dest_path):
+                    print(f"Removing existing directory: {dest_path}")
+                    shutil.rmtree(dest_path)
+                os.mkdir(dest_path)
+            stack.extend(
+                (os.path.join(src_path, item), os.path.join(dest_path, item))
+                for item in reversed(listing(src_path))
+            )
@@ -0,0 +1,336 @@
+"""
+CSS minification and per-page critical CSS.
+
+Stylesheets are minified and parsed once per distinct content (cached by
+hash). Each style rule's selectors are reduced to the tags, classes and
+ids they require, so choosing the rules a page can use is only a few set
+checks per selector. Matching is conservative: combinators, attribute
+selectors and pseudo-classes are ignored, so a rule is only dropped when
+the page certainly lacks something it needs. Inlined rules have their
+relative url() and @import references rebased onto the stylesheet's URL.
+"""
+
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from urllib.parse import urljoin, urlparse
+
+CACHE_LIMIT = 64
+
+_STRING = r""""(?:[^"\\\n]|\\.)*"?|'(?:[^'\\\n]|\\.)*'?"""
+_COMMENT_PATTERN = re.compile(r"(/\*[\s\S]*?(?:\*/|\Z))|(" + _STRING + r")|([^\"'/]+|/)")
+_STRING_PATTERN = re.compile(r"(" + _STRING + r")|([^\"']+)")
+_SPACE_PATTERN = re.compile(r"\s+")
+_PUNCT_SPACE_PATTERN = re.compile(r" ?([{};,>]) ?")
+# A space before a colon that ends in `;` or `}` rather than `{`, so it
+# sits in a declaration and not in a selector like `a :hover`
+_DECLARATION_COLON_PATTERN = re.compile(r" :(?=[^{};]*(?:[;}]|\Z))")
+
+# url(...) and @import "..." references, matched alongside plain strings so
+# text inside a string is never taken for one
+_URL_PATTERN = re.compile(
+    r"""(url\(\s*)("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|[^)"'\s]*)(\s*\))"""
+    r"""|(@import ?)("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')"""
+    r"|" + _STRING,
+    re.IGNORECASE,
+)
+
+# At-rules whose block holds further rules to filter; other at-rules with
+# a block (@font-face, @keyframes, ...) are kept whole
+_GROUPING_PATTERN = re.compile(r"@(?:media|supports|layer|container)\b", re.IGNORECASE)
+
+# Pieces of a selector that don't name a tag, class or id
+_ATTRIBUTE_PATTERN = re.compile(r"\[[^\]]*\]")
+_PSEUDO_PATTERN = re.compile(r"::?[\w-]+(?:\((?:[^()]|\([^()]*\))*\))?")
+_TAG_PATTERN = re.compile(r"(?:^|[\s>+~])([a-zA-Z][\w-]*)")
+_CLASS_PATTERN = re.compile(r"\.((?:[\w-]|\\.)+)")
+_ID_PATTERN = re.compile(r"#((?:[\w-]|\\.)+)")
+_UNESCAPE_PATTERN = re.compile(r"\\(.)")
+
+_LINK_PATTERN = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+_LINK_ATTR_PATTERN = re.compile(r"""([\w-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+
+
+def minify_css(text):
+    """Strip comments and redundant whitespace, leaving strings intact."""
+    parts = []
+    for comment, string, other in _COMMENT_PATTERN.findall(text):
+        # A comment still separates the tokens around it
+        parts.append(" " if comment else string or other)
+    out = []
+    for string, other in _STRING_PATTERN.findall("".join(parts)):
+        if string:
+            out.append(string)
+        else:
+            other = _PUNCT_SPACE_PATTERN.sub(r"\1", _SPACE_PATTERN.sub(" ", other))
+            out.append(other.replace(": ", ":").replace(";}", "}"))
+    minified = "".join(out).strip()
+    if " :" not in minified:
+        return minified
+    # Blank out strings so the lookahead can't see braces inside them
+    masked = _STRING_PATTERN.sub(
+        lambda m: "x" * len(m.group()) if m.group(1) else m.group(), minified
+    )
+    spaces = {m.start() for m in _DECLARATION_COLON_PATTERN.finditer(masked)}
+    return "".join(c for i, c in enumerate(minified) if i not in spaces)
+
+
+def _rebase_url(url, base):
+    """`url` resolved against `base` if it's relative to the stylesheet."""
+    if not url or url.startswith(("/", "#")):
+        return url
+    parsed = urlparse(url)
+    if parsed.scheme or parsed.netloc:
+        return url
+    return urljoin(base, url)
+
+
+def rebase_urls(css, base):
+    """
+    Rewrite the relative url(...) and @import references in `css` against
+    `base`, the stylesheet's own URL, so they still resolve once the rules
+    are inlined into a page elsewhere on the site.
+    """
+
+    def replace(match):
+        if match.group(1):
+            target = match.group(2)
+            quote = target[:1] if target[:1] in "\"'" else ""
+            inner = target[1:-1] if quote else target
+            return f"{match.group(1)}{quote}{_rebase_url(inner, base)}{quote}{match.group(3)}"
+        if match.group(4):
+            target = match.group(5)
+            return f"{match.group(4)}{target[0]}{_rebase_url(target[1:-1], base)}{target[0]}"
+        return match.group()
+
+    return _URL_PATTERN.sub(replace, css)
+
+
+def _skip_string(text, i):
+    """Index just past the string literal starting at text[i]."""
+    quote = text[i]
+    i += 1
+    while i < len(text) and text[i] != quote:
+        i += 2 if text[i] == "\\" else 1
+    return i + 1
+
+
+def _split_selectors(prelude):
+    """Split a selector list on the commas that aren't inside parentheses."""
+    selectors = []
+    depth = 0
+    start = 0
+    for i, c in enumerate(prelude):
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "," and depth == 0:
+            selectors.append(prelude[start:i])
+            start = i + 1
+    selectors.append(prelude[start:])
+    return [s.strip() for s in selectors if s.strip()]
+
+
+def _requirements(selector):
+    """(tags, classes, ids) a page must contain for `selector` to match."""
+    bare = _PSEUDO_PATTERN.sub("", _ATTRIBUTE_PATTERN.sub("", selector))
+    tags = frozenset(t.lower() for t in _TAG_PATTERN.findall(bare))
+    classes = frozenset(_UNESCAPE_PATTERN.sub(r"\1", c) for c in _CLASS_PATTERN.findall(bare))
+    ids = frozenset(_UNESCAPE_PATTERN.sub(r"\1", i) for i in _ID_PATTERN.findall(bare))
+    return tags, classes, ids
+
+
+def _parse(css, i=0):
+    """
+    Parse minified CSS from index `i` up to an unmatched `}` or the end.
+
+    Returns:
+        tuple: (items, index of the closing brace or len(css)), where each
+        item is ("raw", text), ("rule", [(selector, requirements)], body)
+        or ("group", prelude, items).
+    """
+    items = []
+    start = i
+    depth = 0
+    while i < len(css):
+        c = css[i]
+        if c in "\"'":
+            i = _skip_string(css, i)
+            continue
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif depth == 0 and c == ";":
+            items.append(("raw", css[start : i + 1]))
+            start = i + 1
+        elif depth == 0 and c == "}":
+            return items, i
+        elif depth == 0 and c == "{":
+            prelude = css[start:i].strip()
+            if _GROUPING_PATTERN.match(prelude):
+                children, i = _parse(css, i + 1)
+                items.append(("group", prelude, children))
+            else:
+                body_start = i + 1
+                _, i = _parse(css, body_start)
+                body = css[body_start:i]
+                if prelude.startswith("@"):
+                    items.append(("raw", f"{prelude}{{{body}}}"))
+                else:
+                    selectors = [(s, _requirements(s)) for s in _split_selectors(prelude)]
+                    items.append(("rule", selectors, body))
+            start = i + 1
+        i += 1
+    return items, i
+
+
+def _select(items, tags, classes, ids):
+    out = []
+    for item in items:
+        if item[0] == "raw":
+            out.append(item[1])
+        elif item[0] == "rule":
+            matched = [
+                selector
+                for selector, (need_tags, need_classes, need_ids) in item[1]
+                if need_tags <= tags and need_classes <= classes and need_ids <= ids
+            ]
+            if matched:
+                out.append(f"{','.join(matched)}{{{item[2]}}}")
+        else:
+            inner = _select(item[2], tags, classes, ids)
+            if inner:
+                out.append(f"{item[1]}{{{inner}}}")
+    return "".join(out)
+
+
+class Stylesheet:
+    """
+    A minified stylesheet, parsed for selector matching. With a `base` URL,
+    the parsed rules have their relative references rebased onto it.
+    """
+
+    def __init__(self, text, base=None):
+        self.minified = minify_css(text)
+        rules = rebase_urls(self.minified, base) if base else self.minified
+        # A literal </style> would end an inlined <style> block early
+        self.inlinable = "</style" not in rules.lower()
+        self.items, _ = _parse(rules)
+
+    def select(self, tags, classes, ids):
+        """Minified CSS of the rules that can apply to a page with these names."""
+        return _select(self.items, tags, classes, ids)
+
+
+_cache = OrderedDict()
+
+
+def load_stylesheet(text, base=None):
+    """Stylesheet for `text` served from `base`, cached by content hash."""
+    key = (hashlib.sha256(text.encode("utf-8")).digest(), base)
+    sheet = _cache.get(key)
+    if sheet is None:
+        sheet = Stylesheet(text, base)
+        _cache[key] = sheet
+        if len(_cache) > CACHE_LIMIT:
+            _cache.popitem(last=False)
+    else:
+        _cache.move_to_end(key)
+    return sheet
+
+
+def minify_file(path):
+    """Minified text of the stylesheet at `path`."""
+    with open(path, encoding="utf-8") as f:
+        return load_stylesheet(f.read()).minified
+
+
+def clear_cache():
+    _cache.clear()
+
+
+def _link_attrs(tag):
+    attrs = {}
+    for name, double, single, bare in _LINK_ATTR_PATTERN.findall(tag):
+        attrs[name.lower()] = double or single or bare
+    return attrs
+
+
+class CriticalCSS:
+    """
+    Replaces a page's `<link rel="stylesheet">` tags to local stylesheets
+    under `static` with `<style>` blocks holding only the rules that page
+    can use, so it renders without a blocking request. Sheets containing
+    a literal `</style` are left linked.
+    """
+
+    def __init__(self, static):
+        self.static = static
+        # stylesheet path -> ((mtime_ns, size), Stylesheet)
+        self._sheets = {}
+        # template text -> names the template itself uses
+        self._templates = {}
+
+    def _stylesheet(self, href):
+        parsed = urlparse(href)
+        if parsed.scheme or parsed.netloc or not parsed.path.startswith("/"):
+            return None
+        path = os.path.join(self.static, *parsed.path.lstrip("/").split("/"))
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self._sheets.get(path)
+        if cached is None or cached[0] != stamp:
+            with open(path, encoding="utf-8") as f:
+                cached = (stamp, load_stylesheet(f.read(), parsed.path))
+            self._sheets[path] = cached
+        return cached[1]
+
+    def _template_usage(self, template):
+        usage = self._templates.get(template)
+        if usage is None:
+            from transforms import UsageCollector
+
+            collector = UsageCollector()
+            collector.scan(template)
+            usage = self._templates[template] = collector
+        return usage
+
+    def inline(self, html, template, usage):
+        """
+        Inline the stylesheets linked from the head of `html`, a page
+        rendered from `template` whose content tree's names were gathered
+        by the transforms.UsageCollector `usage`.
+
+        Returns:
+            tuple: (html, hrefs) where hrefs lists the inlined stylesheets.
+        """
+        head_end = html.find("</head>")
+        if head_end == -1:
+            return html, []
+        base = self._template_usage(template)
+        tags = base.tag_names | usage.tag_names
+        classes = base.classes | usage.classes
+        ids = base.ids | usage.ids
+
+        hrefs = []
+
+        def replace(match):
+            attrs = _link_attrs(match.group())
+            if "stylesheet" not in attrs.get("rel", "").lower().split():
+                return match.group()
+            if attrs.get("media", "all").lower() != "all":
+                return match.group()
+            sheet = self._stylesheet(attrs.get("href", ""))
+            if sheet is None or not sheet.inlinable:
+                return match.group()
+            hrefs.append(attrs["href"])
+            return f"<style>{sheet.select(tags, classes, ids)}</style>"
+
+        head = _LINK_PATTERN.sub(replace, html[:head_end])
+        return head + html[head_end:], hrefs
@@ -0,0 +1,6 @@
+"""
+Default locations shared by the CLI and the build. Kept free of imports so
+main.py can use them without loading the build modules.
+"""
+
+DEFAULT_CACHE_DIR = ".ssg-cache"
@@ -0,0 +1,111 @@
+"""
+Reverse dependency index from build inputs to pages.
+
+Every rendered page records the inputs it was built from: its markdown
+source, the template and partials it used, and the static assets it
+references. The index keeps that forward mapping plus a fingerprint
+(mtime, size) for each input, and derives the reverse mapping so a
+changed input maps straight to the pages that depend on it.
+"""
+
+import json
+import os
+
+INDEX_FILE = "deps.json"
+INDEX_VERSION = 1
+
+
+def fingerprint(path):
+    """(mtime_ns, size) of `path`, or None if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+class DependencyIndex:
+    def __init__(self, path=None):
+        self.path = path
+        # page -> sorted list of inputs
+        self.pages = {}
+        # input -> fingerprint at the time it was last recorded
+        self.fingerprints = {}
+        # input -> set of pages depending on it
+        self.reverse = {}
+        # Build options the recorded outputs were produced with
+        self.options = None
+
+    @classmethod
+    def load(cls, path):
+        index = cls(path)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+        if data.get("version") != INDEX_VERSION:
+            return index
+        index.fingerprints = data.get("fingerprints", {})
+        index.options = data.get("options")
+        for page, inputs in data.get("pages", {}).items():
+            index.record(page, inputs)
+        return index
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Forget fingerprints nobody depends on any more
+        fingerprints = {k: v for k, v in self.fingerprints.items() if k in self.reverse}
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": INDEX_VERSION,
+                    "options": self.options,
+                    "pages": self.pages,
+                    "fingerprints": fingerprints,
+                },
+                f,
+            )
+        os.replace(tmp, self.path)
+
+    def record(self, page, inputs):
+        """Replace `page`'s dependencies, updating the reverse index in place."""
+        self.remove(page)
+        inputs = sorted(set(inputs))
+        self.pages[page] = inputs
+        for path in inputs:
+            self.reverse.setdefault(path, set()).add(page)
+
+    def remove(self, page):
+        for path in self.pages.pop(page, ()):
+            dependents = self.reverse.get(path)
+            if dependents is not None:
+                dependents.discard(page)
+                if not dependents:
+                    del self.reverse[path]
+
+    def refresh(self, inputs):
+        """Store current fingerprints for `inputs` after they were built from."""
+        for path in inputs:
+            self.fingerprints[path] = fingerprint(path)
+
+    def changed_inputs(self):
+        """Inputs whose fingerprint differs from the recorded one."""
+        return {
+            path
+            for path in self.reverse
+            if path not in self.fingerprints or fingerprint(path) != self.fingerprints[path]
+        }
+
+    def affected_pages(self, changed):
+        """Pages depending on any of the `changed` inputs."""
+        pages = set()
+        for path in changed:
+            pages.update(self.reverse.get(path, ()))
+        return pages
+
+    def dependents(self, path):
+        return sorted(self.reverse.get(path, ()))
@@ -0,0 +1,112 @@
+"""
+Front-matter metadata for markdown pages.
+
+A page may start with a block like:
+
+    ---
+    title: Hello world
+    date: 2024-05-01
+    tags: [python, ssg]
+    draft: true
+    ---
+
+Values are strings, integers, booleans or lists; lists can be written
+inline (`[a, b]`) or as indented `- item` lines under an empty key.
+Keys in STRING_KEYS (such as `title`) are always kept as strings, so
+`title: 2024` or `title: no` mean what they say.
+"""
+
+FENCE = "---"
+# Upper bound on how much of a file is read looking for the header
+MAX_HEADER_BYTES = 64 * 1024
+# Keys whose values are never coerced to booleans or integers
+STRING_KEYS = frozenset({"title"})
+
+
+def _parse_scalar(value, coerce=True):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    if not coerce:
+        return value
+    lowered = value.lower()
+    if lowered in ("true", "yes"):
+        return True
+    if lowered in ("false", "no"):
+        return False
+    if value.lstrip("-").isdigit():
+        return int(value)
+    return value
+
+
+def parse_front_matter(text):
+    """Parse the lines between the `---` fences into a dict."""
+    meta = {}
+    current_list = None
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith("- ") and current_list is not None:
+            current_list.append(_parse_scalar(stripped[2:]))
+            continue
+        key, sep, value = line.partition(":")
+        if not sep:
+            raise ValueError(f"invalid front matter line: {line!r}")
+        key = key.strip()
+        value = value.strip()
+        current_list = None
+        if not value:
+            current_list = meta[key] = []
+        elif value.startswith("[") and value.endswith("]"):
+            inner = value[1:-1].strip()
+            meta[key] = [_parse_scalar(v) for v in inner.split(",")] if inner else []
+        else:
+            meta[key] = _parse_scalar(value, key not in STRING_KEYS)
+    return meta
+
+
+def split_front_matter(markdown):
+    """
+    Separate a page's front matter from its body.
+
+    Returns:
+        tuple: (meta, body); meta is {} when the page has no front matter.
+    """
+    if not markdown.startswith(FENCE):
+        return {}, markdown
+    lines = markdown.split("\n")
+    if lines[0].strip() != FENCE:
+        return {}, markdown
+    for i in range(1, len(lines)):
+        if lines[i].strip() == FENCE:
+            meta = parse_front_matter("\n".join(lines[1:i]))
+            return meta, "\n".join(lines[i + 1 :])
+    raise ValueError("unterminated front matter")
+
+
+def read_header(path, max_bytes=MAX_HEADER_BYTES):
+    """
+    Read only the front matter of the file at `path`, stopping at the
+    closing fence without touching the body.
+    """
+    header = []
+    read = 0
+    with open(path, "rb") as f:
+        first = f.readline(max_bytes)
+        if first.strip() != FENCE.encode():
+            return {}
+        read += len(first)
+        while read < max_bytes:
+            line = f.readline(max_bytes - read)
+            if not line:
+                break
+            read += len(line)
+            if line.strip() == FENCE.encode():
+                return parse_front_matter(b"".join(header).decode("utf-8"))
+            header.append(line)
+    raise ValueError(f"unterminated front matter in {path}")
+
+
+def is_draft(meta):
+    return meta.get("draft") is True
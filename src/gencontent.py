@@ -0,0 +1,174 @@
+import os
+import re
+
+from frontmatter import split_front_matter
+from htmlnode import TransformPipeline, to_minified_html
+from markdown_blocks import iter_block_nodes, markdown_to_html_node
+from transforms import AssetCollector, UsageCollector
+
+# `{{> partials/nav.html }}` includes another file, relative to the template
+_INCLUDE_PATTERN = re.compile(r"\{\{>\s*([^}\s]+)\s*\}\}")
+MAX_INCLUDE_DEPTH = 8
+
+
+def write_file_atomic(dest_path, text):
+    """
+    Write `text` to `dest_path` via a temporary file and a rename, so
+    readers never see a partial file and an existing file's inode, which
+    may be shared with an older generation, is replaced rather than
+    truncated.
+    """
+    dest_dir = os.path.dirname(dest_path)
+    if dest_dir:
+        os.makedirs(dest_dir, exist_ok=True)
+    tmp_path = f"{dest_path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, dest_path)
+
+
+def extract_title(markdown):
+    """
+    Return the text of the first `# ` heading in a markdown document.
+
+    Raises:
+        ValueError: if the document has no h1 heading.
+    """
+    for line in markdown.split("\n"):
+        if line.startswith("# "):
+            return line[2:].strip()
+    raise ValueError("no title found")
+
+
+def load_template(template_path):
+    """
+    Read a template and expand its `{{> path }}` includes.
+
+    Returns:
+        tuple: (text, paths) where paths lists the template and every
+        partial it pulled in.
+    """
+    with open(template_path, encoding="utf-8") as f:
+        text = f.read()
+    paths = [template_path]
+    base = os.path.dirname(template_path)
+
+    for _ in range(MAX_INCLUDE_DEPTH):
+        names = set(_INCLUDE_PATTERN.findall(text))
+        if not names:
+            return text, paths
+        partials = {}
+        for name in names:
+            path = os.path.join(base, name)
+            with open(path, encoding="utf-8") as f:
+                partials[name] = f.read()
+            paths.append(path)
+        text = _INCLUDE_PATTERN.sub(lambda m: partials[m.group(1)], text)
+    raise ValueError(f"template includes nested too deeply in {template_path}")
+
+
+def fill_template(template, title, content):
+    return template.replace("{{ Title }}", title).replace("{{ Content }}", content)
+
+
+def _render_content(markdown, minify, collectors, workers=1, worker_peaks=None):
+    node = markdown_to_html_node(markdown, workers, worker_peaks=worker_peaks)
+    if collectors:
+        TransformPipeline(collectors).apply(node)
+    if minify:
+        return to_minified_html(node)
+    return node.to_html(), 0
+
+
+def _stream_content(markdown, minify, collectors):
+    """
+    Same output as _render_content, but each block's tree is serialized
+    and dropped before the next one is built.
+    """
+    stats = {"bytes_saved": 0}
+    pipeline = TransformPipeline(collectors) if collectors else None
+    parts = ["<div>"]
+    for node in iter_block_nodes(markdown):
+        if pipeline is not None:
+            pipeline.apply(node)
+        parts.append(node.to_html(minify, stats) if minify else node.to_html())
+    parts.append("</div>")
+    return "".join(parts), stats["bytes_saved"]
+
+
+def render_page(markdown, template, minify=False, assets=None, memory=None, name="<page>", workers=1, css=None):
+    """
+    Render a markdown document into `template`. A front-matter `title`
+    takes precedence over the document's h1. If `assets` is a set, the
+    image and link URLs the page references are added to it.
+
+    If `memory` is a MemoryTracker, the render's peak memory is recorded
+    under `name`, and a page over its budget is failed or streamed
+    according to the tracker's policy. `workers` > 1 builds the blocks of
+    large documents in a process pool (see markdown_to_html_node).
+
+    If `css` is a css.CriticalCSS, the template's local stylesheets are
+    inlined with only the rules this page's tags and classes can match;
+    their URLs are added to `assets`.
+
+    Returns:
+        tuple: (html, bytes_saved) where bytes_saved is 0 unless minifying.
+    """
+    meta, markdown = split_front_matter(markdown)
+    collectors = []
+    if assets is not None:
+        asset_collector = AssetCollector()
+        collectors.append(asset_collector)
+    if css is not None:
+        usage = UsageCollector()
+        collectors.append(usage)
+
+    if memory is None:
+        content, saved = _render_content(markdown, minify, collectors, workers)
+    else:
+        content, saved = memory.render(
+            name,
+            len(markdown),
+            lambda: _render_content(markdown, minify, collectors, workers, memory.workers),
+            lambda: _stream_content(markdown, minify, collectors),
+        )
+    if assets is not None:
+        assets.update(asset_collector.urls)
+
+    title = meta.get("title") or extract_title(markdown)
+    html = fill_template(template, title, content)
+    if css is not None:
+        html, stylesheets = css.inline(html, template, usage)
+        if assets is not None:
+            assets.update(stylesheets)
+    return html, saved
+
+
+def generate_page(
+    from_path, template_path, dest_path, minify=False, deps=None, write=write_file_atomic, memory=None, workers=1, css=None
+) -> int:
+    """
+    Render the markdown file at `from_path` through the template and write
+    the page to `dest_path` with `write(dest_path, html)`. Returns the
+    bytes saved by minification.
+
+    If `deps` is a dict, it is filled with the "templates" (template and
+    partial paths) and "assets" (referenced URLs) the page was built from.
+    `memory` (an optional MemoryTracker), `workers` and `css` are passed
+    on to render_page.
+    """
+    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    with open(from_path, encoding="utf-8") as f:
+        markdown = f.read()
+    template, template_paths = load_template(template_path)
+
+    assets = set() if deps is not None else None
+    html, saved = render_page(markdown, template, minify, assets, memory, from_path, workers, css)
+    if deps is not None:
+        deps["templates"] = template_paths
+        deps["assets"] = sorted(assets)
+
+    write(dest_path, html)
+    if minify:
+        print(f"Minified {dest_path}: saved {saved} bytes")
+    return saved
@@ -0,0 +1,261 @@
+"""
+Lightweight server-side syntax highlighting for fenced code blocks.
+
+Each supported language is a single compiled regex of named token rules.
+Output is HTML-escaped code with `<span class="tok-...">` around tokens.
+Results are cached by (language, snippet hash) in a thread-safe LRU, and
+`precompute` can highlight a batch of snippets across worker processes
+when the caller asks for them.
+"""
+
+import hashlib
+import html
+import re
+import threading
+from collections import OrderedDict
+
+# Below this many uncached snippets, a process pool costs more than it saves.
+PARALLEL_THRESHOLD = 32
+CACHE_LIMIT = 4096
+
+# Token group name -> CSS class. "name" tokens are classified separately.
+_CLASSES = {
+    "com": "tok-com",
+    "str": "tok-str",
+    "num": "tok-num",
+    "deco": "tok-deco",
+    "var": "tok-var",
+    "attr": "tok-attr",
+    "kw": "tok-kw",
+}
+
+# Unterminated strings and comments run to the end of the line/input
+# instead of failing, so one bad quote can't cause rescanning.
+_DQ_STRING = r'"(?:[^"\\\n]|\\.)*"?'
+_SQ_STRING = r"'(?:[^'\\\n]|\\.)*'?"
+_C_COMMENT = r"//[^\n]*|/\*[\s\S]*?(?:\*/|\Z)"
+_NUMBER = r"\b(?:0[xXbBoO][0-9a-fA-F_]+|\d[\d_]*(?:\.\d+)?(?:[eE][+-]?\d+)?)\b"
+_NAME = r"[A-Za-z_$][\w$]*"
+
+
+class _Language:
+    def __init__(self, rules, keywords=(), builtins=()):
+        self.pattern = re.compile("|".join(f"(?P<{group}>{rx})" for group, rx in rules))
+        self.keywords = frozenset(keywords)
+        self.builtins = frozenset(builtins)
+
+    def highlight(self, code):
+        out = []
+        pos = 0
+        for m in self.pattern.finditer(code):
+            if m.start() > pos:
+                out.append(html.escape(code[pos:m.start()], quote=False))
+            text = html.escape(m.group(), quote=False)
+            group = m.lastgroup
+            if group == "name":
+                if m.group() in self.keywords:
+                    css = "tok-kw"
+                elif m.group() in self.builtins:
+                    css = "tok-builtin"
+                else:
+                    css = None
+            else:
+                css = _CLASSES.get(group)
+            out.append(f'<span class="{css}">{text}</span>' if css else text)
+            pos = m.end()
+        out.append(html.escape(code[pos:], quote=False))
+        return "".join(out)
+
+
+_PYTHON = _Language(
+    [
+        ("com", r"#[^\n]*"),
+        ("str", r"(?i:[rbuf]{0,2})(?:\"\"\"[\s\S]*?(?:\"\"\"|\Z)|'''[\s\S]*?(?:'''|\Z)|" + _DQ_STRING + "|" + _SQ_STRING + ")"),
+        ("deco", r"@[A-Za-z_][\w.]*"),
+        ("num", _NUMBER + r"j?"),
+        ("name", r"[A-Za-z_]\w*"),
+    ],
+    keywords="""False None True and as assert async await break class continue def
+        del elif else except finally for from global if import in is lambda match case
+        nonlocal not or pass raise return try while with yield""".split(),
+    builtins="""print len range str int float list dict set tuple bool type isinstance
+        open super object enumerate zip map filter sorted min max sum any all abs
+        self cls""".split(),
+)
+
+_JAVASCRIPT = _Language(
+    [
+        ("com", _C_COMMENT),
+        ("str", _DQ_STRING + "|" + _SQ_STRING + r"|`(?:[^`\\]|\\.)*`?"),
+        ("num", _NUMBER + r"n?"),
+        ("name", _NAME),
+    ],
+    keywords="""break case catch class const continue debugger default delete do else
+        export extends finally for function if import in instanceof let new return
+        super switch this throw try typeof var void while with yield async await of
+        static get set true false null undefined interface type enum implements
+        private public protected readonly""".split(),
+    builtins="""console window document Math JSON Object Array String Number Boolean
+        Promise Map Set Error""".split(),
+)
+
+_GO = _Language(
+    [
+        ("com", _C_COMMENT),
+        ("str", _DQ_STRING + "|" + _SQ_STRING + r"|`[^`]*`?"),
+        ("num", _NUMBER),
+        ("name", _NAME),
+    ],
+    keywords="""break case chan const continue default defer else fallthrough for func
+        go goto if import interface map package range return select struct switch type
+        var true false nil iota""".split(),
+    builtins="""append cap close complex copy delete imag len make new panic print
+        println real recover string int int64 float64 bool byte rune error""".split(),
+)
+
+_BASH = _Language(
+    [
+        ("com", r"(?<![^\s;])#[^\n]*"),
+        ("str", _DQ_STRING + "|" + r"'[^']*'?"),
+        ("var", r"\$(?:\{[^}\n]*\}?|\w+|[@#?$!*-])"),
+        ("num", _NUMBER),
+        ("name", r"[A-Za-z_][\w-]*"),
+    ],
+    keywords="""if then else elif fi for while until do done case esac in function
+        return local export break continue select""".split(),
+    builtins="""echo cd printf read source exit set unset test cat grep sed awk ls rm
+        mkdir cp mv python3 git""".split(),
+)
+
+_JSON = _Language(
+    [
+        ("attr", _DQ_STRING + r"(?=\s*:)"),
+        ("str", _DQ_STRING),
+        ("num", r"-?" + _NUMBER),
+        ("name", r"[A-Za-z]+"),
+    ],
+    keywords=["true", "false", "null"],
+)
+
+_CSS = _Language(
+    [
+        ("com", r"/\*[\s\S]*?(?:\*/|\Z)"),
+        ("str", _DQ_STRING + "|" + _SQ_STRING),
+        ("kw", r"@[\w-]+|!important"),
+        ("attr", r"[\w-]+(?=\s*:[^:])"),
+        ("num", r"#[0-9a-fA-F]{3,8}\b|-?\d*\.?\d+(?:%|[a-zA-Z]+)?"),
+    ],
+)
+
+LANGUAGES = {
+    "python": _PYTHON,
+    "py": _PYTHON,
+    "javascript": _JAVASCRIPT,
+    "js": _JAVASCRIPT,
+    "typescript": _JAVASCRIPT,
+    "ts": _JAVASCRIPT,
+    "go": _GO,
+    "bash": _BASH,
+    "sh": _BASH,
+    "shell": _BASH,
+    "json": _JSON,
+    "css": _CSS,
+}
+
+_cache = OrderedDict()
+# The preview server highlights from several request threads at once
+_cache_lock = threading.Lock()
+
+
+def is_supported(lang):
+    return lang is not None and lang.lower() in LANGUAGES
+
+
+def _cache_key(lang, code):
+    return lang.lower(), hashlib.sha1(code.encode("utf-8")).digest()
+
+
+def _store(key, result):
+    with _cache_lock:
+        _cache[key] = result
+        _cache.move_to_end(key)
+        if len(_cache) > CACHE_LIMIT:
+            _cache.popitem(last=False)
+
+
+def _lookup(key):
+    with _cache_lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+        return result
+
+
+def _highlight_uncached(lang, code):
+    return LANGUAGES[lang.lower()].highlight(code)
+
+
+def highlight(lang, code):
+    """
+    Return `code` as escaped HTML with token spans, or None if `lang`
+    isn't supported.
+    """
+    if not is_supported(lang):
+        return None
+    key = _cache_key(lang, code)
+    result = _lookup(key)
+    if result is None:
+        result = _highlight_uncached(lang, code)
+        _store(key, result)
+    return result
+
+
+def _highlight_batch(batch):
+    return [_highlight_uncached(lang, code) for lang, code in batch]
+
+
+def precompute(snippets, workers=1, threshold=PARALLEL_THRESHOLD):
+    """
+    Fill the cache for an iterable of (lang, code) pairs. With `workers`
+    > 1 (None for one per CPU) and at least `threshold` of them uncached,
+    they are highlighted in a process pool. The default never starts one,
+    so library callers such as the preview server's request threads
+    don't fork. Only the last CACHE_LIMIT results stay cached, so pass at
+    most that many snippets ahead of using them.
+
+    Returns:
+        int: how many snippets had to be highlighted.
+    """
+    pending = {}
+    for lang, code in snippets:
+        if is_supported(lang):
+            key = _cache_key(lang, code)
+            if key not in pending and _lookup(key) is None:
+                pending[key] = (lang, code)
+    if not pending:
+        return 0
+
+    keys = list(pending)
+    items = [pending[k] for k in keys]
+    if workers is None:
+        import os
+
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(items) < threshold:
+        results = _highlight_batch(items)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        size = max(1, -(-len(items) // (workers * 4)))
+        batches = [items[i : i + size] for i in range(0, len(items), size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = [r for batch in pool.map(_highlight_batch, batches) for r in batch]
+
+    for key, result in zip(keys, results):
+        _store(key, result)
+    return len(items)
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -1,3 +1,25 @@
+import re
+from time import perf_counter
+
+# Elements whose text content is whitespace-significant and must be
+# serialized verbatim even when minifying.
+PRESERVE_WHITESPACE_TAGS = frozenset({"pre", "code", "textarea", "script", "style"})
+
+# ASCII whitespace only: non-breaking spaces are content, not formatting.
+_WHITESPACE_RUN = re.compile(r"[ \t\n\r\f]{2,}|[\t\n\r\f]")
+_UNQUOTED_ATTR_VALUE = re.compile(r"[^\s\"'=<>`]+")
+
+
+def _collapse_whitespace(text, stats):
+    """Collapse runs of whitespace to a single space, counting removed UTF-8 bytes."""
+    collapsed = _WHITESPACE_RUN.sub(" ", text)
+    # Only ASCII whitespace is replaced, so equal lengths mean nothing was saved
+    if stats is not None and len(collapsed) != len(text):
+        saved = len(text.encode("utf-8")) - len(collapsed.encode("utf-8"))
+        stats["bytes_saved"] = stats.get("bytes_saved", 0) + saved
+    return collapsed
+
+
 class HTMLNode:
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
@@ -5,15 +27,23 @@ class HTMLNode:
         self.children = children
         self.props = props
 
-    def to_html(self):
+    def to_html(self, minify=False, stats=None, _preserve=False):
         raise NotImplementedError("to_html method not implemented")
 
-    def props_to_html(self):
+    def props_to_html(self, minify=False, stats=None):
         if self.props is None:
             return ""
         props_html = ""
         for prop in self.props:
-            props_html += f' {prop}="{self.props[prop]}"'
+            value = self.props[prop]
+            # Quotes are only optional when the value can't end the attribute early
+            if minify and _UNQUOTED_ATTR_VALUE.fullmatch(str(value)):
+                props_html += f" {prop}={value}"
+                if stats is not None:
+                    # The two dropped quote characters, one byte each in UTF-8
+                    stats["bytes_saved"] = stats.get("bytes_saved", 0) + 2
+            else:
+                props_html += f' {prop}="{value}"'
         return props_html
 
     def __repr__(self):
@@ -24,12 +54,15 @@ class LeafNode(HTMLNode):
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
 
-    def to_html(self):
+    def to_html(self, minify=False, stats=None, _preserve=False):
         if self.value is None:
             raise ValueError("invalid HTML: no value")
+        value = self.value
+        if minify and not _preserve and self.tag not in PRESERVE_WHITESPACE_TAGS:
+            value = _collapse_whitespace(value, stats)
         if self.tag is None:
-            return self.value
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+            return value
+        return f"<{self.tag}{self.props_to_html(minify, stats)}>{value}</{self.tag}>"
 
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
@@ -39,15 +72,138 @@ class ParentNode(HTMLNode):
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
 
-    def to_html(self):
-        if self.tag is None:
-            raise ValueError("invalid HTML: no tag")
-        if self.children is None:
-            raise ValueError("invalid HTML: no children")
-        children_html = ""
-        for child in self.children:
-            children_html += child.to_html()
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+    def to_html(self, minify=False, stats=None, _preserve=False):
+        # Serialize with an explicit stack rather than recursing per level,
+        # so arbitrarily deep trees neither hit the recursion limit nor
+        # re-copy every descendant's HTML once per ancestor.
+        parts = []
+        # Entries are (node, preserve) pairs to open, or closing-tag strings
+        stack = [(self, _preserve)]
+        while stack:
+            entry = stack.pop()
+            if isinstance(entry, str):
+                parts.append(entry)
+                continue
+            node, preserve = entry
+            if type(node).to_html is not ParentNode.to_html:
+                parts.append(node.to_html(minify, stats, preserve))
+                continue
+            if node.tag is None:
+                raise ValueError("invalid HTML: no tag")
+            if node.children is None:
+                raise ValueError("invalid HTML: no children")
+            preserve = preserve or node.tag in PRESERVE_WHITESPACE_TAGS
+            parts.append(f"<{node.tag}{node.props_to_html(minify, stats)}>")
+            stack.append(f"</{node.tag}>")
+            for child in reversed(node.children):
+                stack.append((child, preserve))
+        return "".join(parts)
 
     def __repr__(self):
         return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
+
+
+def to_minified_html(node):
+    """
+    Serialize `node` with minification enabled.
+
+    Returns:
+        tuple: (html, bytes_saved) where bytes_saved is how many bytes
+        smaller the output is than the plain `to_html()` result.
+    """
+    stats = {"bytes_saved": 0}
+    html = node.to_html(minify=True, stats=stats)
+    return html, stats["bytes_saved"]
+
+
+class Transform:
+    """
+    A visitor run by TransformPipeline.
+
+    Subclasses set `tags` (tag names, None meaning "any tag") and/or
+    `node_types` (HTMLNode classes, None meaning "any type") to declare
+    which nodes they want, and implement `visit(node)`. Visitors may mutate
+    the node they are given, including its children, which are traversed
+    after the visit.
+    """
+
+    tags = None
+    node_types = None
+
+    @property
+    def name(self):
+        return type(self).__name__
+
+    def wants(self, node_type, tag):
+        if self.node_types is not None and not issubclass(node_type, tuple(self.node_types)):
+            return False
+        return self.tags is None or tag in self.tags
+
+    def visit(self, node):
+        raise NotImplementedError("visit method not implemented")
+
+
+class FunctionTransform(Transform):
+    """Adapts a plain `fn(node)` into a Transform."""
+
+    def __init__(self, fn, tags=None, node_types=None, name=None):
+        self.fn = fn
+        self.tags = frozenset(tags) if tags is not None else None
+        self.node_types = tuple(node_types) if node_types is not None else None
+        self._name = name or getattr(fn, "__name__", "transform")
+
+    @property
+    def name(self):
+        return self._name
+
+    def visit(self, node):
+        self.fn(node)
+
+
+class TransformPipeline:
+    """
+    Applies any number of transforms in a single pre-order traversal.
+
+    For every (node class, tag) pair seen, the transforms interested in it
+    are resolved once and cached, so a node pays only for the visitors that
+    actually match it. Time spent in each transform is accumulated in
+    `timings` (seconds, keyed by transform name).
+    """
+
+    def __init__(self, transforms=None):
+        self.transforms = []
+        self.timings = {}
+        self._dispatch = {}
+        for transform in transforms or []:
+            self.add(transform)
+
+    def add(self, transform, tags=None, node_types=None, name=None):
+        """Register a Transform, or a plain callable with optional filters."""
+        if not isinstance(transform, Transform):
+            transform = FunctionTransform(transform, tags, node_types, name)
+        self.transforms.append(transform)
+        self.timings.setdefault(transform.name, 0.0)
+        self._dispatch.clear()
+        return transform
+
+    def _visitors_for(self, node_type, tag):
+        key = (node_type, tag)
+        visitors = self._dispatch.get(key)
+        if visitors is None:
+            visitors = tuple(t for t in self.transforms if t.wants(node_type, tag))
+            self._dispatch[key] = visitors
+        return visitors
+
+    def apply(self, root):
+        """Run every registered transform over the tree rooted at `root`."""
+        timings = self.timings
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            for transform in self._visitors_for(type(node), node.tag):
+                start = perf_counter()
+                transform.visit(node)
+                timings[transform.name] += perf_counter() - start
+            if node.children:
+                stack.extend(reversed(node.children))
+        return root
@@ -1,5 +1,8 @@
 from textnode import TextNode, TextType
 import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
 from typing import List, Tuple
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
@@ -46,29 +49,34 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
 
 
 
+# Bracket and paren runs are negated character classes, so each match
+# attempt stops at the next bracket/paren and scanning stays linear.
+_IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+_LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+
 def extract_markdown_images(text: str) -> List[Tuple[str, str]]:
     """
     Extracts Markdown image tuples: (alt_text, url)
     Example: '![alt](url)'
     """
-    pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    return re.findall(pattern, text)
+    return _IMAGE_PATTERN.findall(text)
 
 def extract_markdown_links(text: str) -> List[Tuple[str, str]]:
     """
     Extracts Markdown link tuples: (anchor_text, url)
     Example: '[text](url)' but NOT images.
     """
-    pattern = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    return re.findall(pattern, text)
+    return _LINK_PATTERN.findall(text)
 
 
-def split_nodes_image(old_nodes):
+def _split_nodes_pattern(old_nodes, pattern, text_type):
     """
-    Find Markdown images in TEXT nodes and split them into:
-      - TEXT nodes for surrounding text
-      - IMAGE nodes carrying alt text and url
-    Leaves non-TEXT nodes unchanged.
+    Split TEXT nodes around every match of `pattern`, turning each match
+    into a `text_type` node (group 1 = text, group 2 = url).
+
+    The text is scanned once with finditer and sliced by match offsets, so
+    the cost is linear in the text length however many matches it holds.
     """
     new_nodes = []
 
@@ -78,42 +86,32 @@ def split_nodes_image(old_nodes):
             new_nodes.append(node)
             continue
 
-        remaining = node.text
-        
-        while True:
-            images = extract_markdown_images(remaining)
-            # If no images found, add the remaining text as a TEXT node and break
-            if not images:
-                if remaining:
-                    new_nodes.append(TextNode(remaining, TextType.TEXT))
-                break
-
-            # Take the first image found
-            alt_text, url = images[0]
-            image_markup = f"![{alt_text}]({url})"
-            
-            # split around this exact image markup
-            before, sep, after = remaining.partition(image_markup)
-
-            # Sanity: sep should be the image markup
-            # If not, something went wrong and we should break to avoid infinite loop
-            if sep != image_markup:
-                new_nodes.append(TextNode(remaining, TextType.TEXT))
-                break
-
-            # Add TEXT node for text before the image
-            if before:
-                new_nodes.append(TextNode(before, TextType.TEXT))
-
-            # Add IMAGE node
-            new_nodes.append(TextNode(alt_text, TextType.IMAGE, url))
-
-            # Continue with the text after the image
-            remaining = after
-        
+        text = node.text
+        pos = 0
+        for match in pattern.finditer(text):
+            # Add TEXT node for text before the match
+            if match.start() > pos:
+                new_nodes.append(TextNode(text[pos:match.start()], TextType.TEXT))
+            new_nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+            pos = match.end()
+
+        # Add whatever follows the last match
+        if pos < len(text):
+            new_nodes.append(TextNode(text[pos:], TextType.TEXT))
+
     return new_nodes
 
 
+def split_nodes_image(old_nodes):
+    """
+    Find Markdown images in TEXT nodes and split them into:
+      - TEXT nodes for surrounding text
+      - IMAGE nodes carrying alt text and url
+    Leaves non-TEXT nodes unchanged.
+    """
+    return _split_nodes_pattern(old_nodes, _IMAGE_PATTERN, TextType.IMAGE)
+
+
 def split_nodes_link(old_nodes):
     """
     Find Markdown links in TEXT nodes and split them into:
@@ -121,56 +119,135 @@ def split_nodes_link(old_nodes):
       - LINK nodes carrying anchor text and url
     Leaves non-TEXT nodes unchanged.
     """
-    new_nodes = []
+    return _split_nodes_pattern(old_nodes, _LINK_PATTERN, TextType.LINK)
+
+class Definitions:
+    """
+    Reference-link and footnote definitions collected from one document
+    while it is split into blocks, for O(1) lookup during inline parsing.
+    """
+
+    def __init__(self):
+        # normalized label -> url
+        self.links = {}
+        # footnote id -> (number, text); numbered in definition order
+        self.footnotes = {}
+
+    @staticmethod
+    def normalize(label):
+        return " ".join(label.split()).lower()
+
+    def add_link(self, label, url):
+        # The first definition of a label wins
+        self.links.setdefault(self.normalize(label), url)
 
+    def add_footnote(self, note_id, text):
+        if note_id not in self.footnotes:
+            self.footnotes[note_id] = (len(self.footnotes) + 1, text)
+
+    def link(self, label):
+        return self.links.get(self.normalize(label))
+
+
+_current_definitions = ContextVar("definitions", default=None)
+
+
+@contextmanager
+def definitions_scope(definitions):
+    """Make `definitions` visible to inline parsing within the block."""
+    token = _current_definitions.set(definitions)
+    try:
+        yield definitions
+    finally:
+        _current_definitions.reset(token)
+
+
+# `![alt][ref]`, `[text][ref]`, `[text][]`, `[text]` and `[^note]`
+_REFERENCE_PATTERN = re.compile(r"(!?)\[([^\[\]]*)\](?:\[([^\[\]]*)\])?")
+
+
+def split_nodes_reference(old_nodes):
+    """
+    Resolve reference-style links/images and footnote references in TEXT
+    nodes against the current document's Definitions. Brackets that don't
+    name a definition are left as plain text.
+    """
+    definitions = _current_definitions.get()
+    if definitions is None or not (definitions.links or definitions.footnotes):
+        return old_nodes
+
+    new_nodes = []
     for node in old_nodes:
-        # Only attempt to split plain text nodes
-        if not isinstance(node, TextNode) or node.text_type != TextType.TEXT:
+        if not isinstance(node, TextNode) or node.text_type != TextType.TEXT or "[" not in node.text:
             new_nodes.append(node)
             continue
 
-        remaining = node.text
-        
-        while True:
-            links = extract_markdown_links(remaining)
-            # If no links found, add the remaining text as a TEXT node and break
-            if not links:
-                if remaining:
-                    new_nodes.append(TextNode(remaining, TextType.TEXT))
-                break
-
-            # Take the first link found
-            anchor_text, url = links[0]
-            link_markup = f"[{anchor_text}]({url})"
-            
-            # split around this exact link markup
-            before, sep, after = remaining.partition(link_markup)
-
-            # Sanity: sep should be the link markup
-            # If not, something went wrong and we should break to avoid infinite loop
-            if sep != link_markup:
-                new_nodes.append(TextNode(remaining, TextType.TEXT))
-                break
-
-            # Add TEXT node for text before the link
-            if before:
-                new_nodes.append(TextNode(before, TextType.TEXT))
-
-            # Add LINK node
-            new_nodes.append(TextNode(anchor_text, TextType.LINK, url))
-
-            # Continue with the text after the link
-            remaining = after
+        text = node.text
+        # Start of text not yet emitted; unresolved matches stay part of it
+        pending = 0
+        for match in _REFERENCE_PATTERN.finditer(text):
+            bang, label, ref = match.groups()
+            resolved = None
+            if not bang and ref is None and label.startswith("^"):
+                footnote = definitions.footnotes.get(label[1:])
+                if footnote is not None:
+                    resolved = TextNode(str(footnote[0]), TextType.FOOTNOTE, label[1:])
+            else:
+                url = definitions.link(ref or label)
+                if url is not None:
+                    resolved = TextNode(label, TextType.IMAGE if bang else TextType.LINK, url)
+            if resolved is None:
+                continue
+            if match.start() > pending:
+                new_nodes.append(TextNode(text[pending:match.start()], TextType.TEXT))
+            new_nodes.append(resolved)
+            pending = match.end()
+
+        if pending < len(text):
+            new_nodes.append(TextNode(text[pending:], TextType.TEXT))
 
     return new_nodes
 
+
+# Inline splitters applied in order by text_to_textnodes. Each takes and
+# returns a list of TextNodes, splitting only the TEXT ones.
+_INLINE_SPLITTERS = [
+    # 1) Images/Links first (they're stand-alone units)
+    split_nodes_image,
+    split_nodes_link,
+    # 2) Code next (protects inline code from being parsed as references,
+    #    bold or italic)
+    partial(split_nodes_delimiter, delimiter="`", text_type=TextType.CODE),
+    split_nodes_reference,
+    # 3) Bold
+    partial(split_nodes_delimiter, delimiter="**", text_type=TextType.BOLD),
+    # 4) Italic
+    partial(split_nodes_delimiter, delimiter="_", text_type=TextType.ITALIC),
+    partial(split_nodes_delimiter, delimiter="*", text_type=TextType.ITALIC),
+]
+
+
+def register_inline_splitter(splitter, index=None):
+    """
+    Add an inline syntax handler. `splitter(nodes) -> nodes` runs after the
+    built-ins, or at position `index` in the splitter list if given. Pair it
+    with textnode.register_text_type for any new text type it produces.
+    """
+    if index is None:
+        _INLINE_SPLITTERS.append(splitter)
+    else:
+        _INLINE_SPLITTERS.insert(index, splitter)
+
+
 def text_to_textnodes(text): 
     """Convert raw markdown-ish inline text into a flat list of TextNodes by
-    progressively splitting on images, links, code, bold, and italic.
+    progressively splitting on images, links, code, bold, and italic, then
+    any registered third-party splitters.
 
     Order matters:
       1) Images/Links first (they're stand-alone units)
-      2) Code next (protects inline code from being parsed as bold/italic)
+      2) Code next (protects inline code from being parsed as references,
+         bold or italic), then reference-style links and footnotes
       3) Bold
       4) Italic
 
@@ -180,16 +257,6 @@ def text_to_textnodes(text):
     """
 
     nodes = [TextNode(text, TextType.TEXT)]
-
-    # 1) Images
-    nodes = split_nodes_image(nodes)
-    # 2) Links
-    nodes = split_nodes_link(nodes)
-    # 3) Code
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    # 4) Bold
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    # 5) Italic
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)  
-    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
-    return nodes
\ No newline at end of file
+    for splitter in _INLINE_SPLITTERS:
+        nodes = splitter(nodes)
+    return nodes
@@ -1,9 +1,353 @@
-from copystatic import copy_static_to_public
-from textnode import TextNode, TextType
+"""
+Command line entry point.
 
-def main():
-    copy_static_to_public()
+    python3 src/main.py
+    python3 src/main.py build [--minify]
+    python3 src/main.py copy
+    python3 src/main.py rollback
+    python3 src/main.py list [--tag TAG]
+    python3 src/main.py serve [--port 8888]
+    python3 src/main.py render FILE
+    python3 src/main.py bench [FILE]
 
+With no arguments, static/ is copied over public/ as a plain directory.
+Each subcommand imports the modules it needs inside its handler, so a
+plain `copy` never loads the markdown parser, its regexes or its enums.
+"""
 
+import argparse
+import sys
 
-main()
+from defaults import DEFAULT_CACHE_DIR
+
+DEFAULT_STATIC = "static"
+DEFAULT_CONTENT = "content"
+DEFAULT_TEMPLATE = "template.html"
+DEFAULT_DEST = "public"
+
+
+def _memory_tracker(args):
+    if not (args.mem_report or args.page_mem_budget):
+        return None
+    from memtrack import MemoryTracker
+
+    budget = int(args.page_mem_budget * 1024 * 1024) if args.page_mem_budget else None
+    return MemoryTracker(budget, args.over_budget)
+
+
+def cmd_build(args):
+    if args.archive and args.only:
+        print("--archive builds the whole site and can't be combined with --only", file=sys.stderr)
+        return 2
+    memory = _memory_tracker(args)
+    try:
+        if args.archive:
+            from build import build_archive
+
+            build_archive(
+                args.static,
+                args.content,
+                args.template,
+                args.archive,
+                args.minify,
+                args.drafts,
+                args.cache_dir,
+                args.diff_manifest,
+                memory,
+                args.jobs,
+                args.archive_format,
+                args.minify_css,
+                args.inline_css,
+            )
+        elif args.only:
+            from build import build_selection
+
+            build_selection(
+                args.only,
+                args.static,
+                args.content,
+                args.template,
+                args.dest,
+                args.minify,
+                args.drafts,
+                args.cache_dir,
+                args.diff_manifest,
+                memory,
+                args.jobs,
+                args.minify_css,
+                args.inline_css,
+                args.keep,
+            )
+        else:
+            from build import build_site
+
+            build_site(
+                args.static,
+                args.content,
+                args.template,
+                args.dest,
+                args.minify,
+                args.keep,
+                drafts=args.drafts,
+                cache_dir=args.cache_dir,
+                full=args.full,
+                diff_path=args.diff_manifest,
+                memory=memory,
+                workers=args.jobs,
+                minify_css=args.minify_css,
+                inline_css=args.inline_css,
+            )
+    except ValueError as e:
+        from memtrack import MemoryBudgetExceeded
+
+        # Bad selections or archive names and blown page budgets are
+        # reported, not raised
+        if not (args.only or args.archive or isinstance(e, MemoryBudgetExceeded)):
+            raise
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        if memory is not None:
+            if args.mem_report:
+                print(memory.report(args.mem_top))
+            memory.stop()
+    return 0
+
+
+def cmd_copy(args):
+    from build import build_site
+
+    build_site(
+        args.static,
+        None,
+        None,
+        args.dest,
+        keep=args.keep,
+        pages=False,
+        cache_dir=args.cache_dir,
+        minify_css=args.minify_css,
+    )
+    return 0
+
+
+def cmd_rollback(args):
+    from publish import rollback
+
+    try:
+        rollback(args.dest)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_list(args):
+    import os
+
+    from pageindex import INDEX_FILE, PageIndex
+
+    index = PageIndex.load(os.path.join(args.cache_dir, INDEX_FILE))
+    index.scan(args.content)
+    index.save()
+    if args.tag:
+        pages = index.by_tag(args.drafts).get(args.tag, [])
+        entries = [(rel, index.entries[rel]["meta"]) for rel in pages]
+    else:
+        entries = index.pages(args.drafts)
+    for rel, meta in entries:
+        print(f"{rel}\t{meta.get('date', '')}\t{meta.get('title', '')}")
+    return 0
+
+
+def cmd_serve(args):
+    from preview import serve
+
+    serve(args.static, args.content, args.template, args.host, args.port, args.cache_size)
+    return 0
+
+
+def cmd_render(args):
+    from frontmatter import split_front_matter
+    from htmlnode import to_minified_html
+    from markdown_blocks import markdown_to_html_node
+
+    with open(args.file, encoding="utf-8") as f:
+        _, markdown = split_front_matter(f.read())
+    node = markdown_to_html_node(markdown)
+    if args.minify:
+        html, saved = to_minified_html(node)
+        print(f"saved {saved} bytes", file=sys.stderr)
+    else:
+        html = node.to_html()
+    sys.stdout.write(html + "\n")
+    return 0
+
+
+_BENCH_DOCUMENT = """
+# Heading with **bold** and _italic_
+
+A paragraph with `code`, a [link](https://boot.dev) and an
+![image](/images/tolkien.png) spread over
+several lines.
+
+> a quote
+> over two lines
+
+- one
+- two
+- three
+
+1. first
+2. second
+
+```python
+def f(x):
+    return x * 2
+```
+"""
+
+
+def cmd_bench(args):
+    import time
+
+    from markdown_blocks import markdown_to_html_node
+
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            markdown = f.read()
+    else:
+        markdown = _BENCH_DOCUMENT * 50
+
+    parse_total = render_total = 0.0
+    for _ in range(args.iterations):
+        start = time.perf_counter()
+        node = markdown_to_html_node(markdown)
+        parsed = time.perf_counter()
+        node.to_html()
+        parse_total += parsed - start
+        render_total += time.perf_counter() - parsed
+
+    n = args.iterations
+    print(f"{len(markdown)} chars, {n} iterations")
+    print(f"parse:  {parse_total / n * 1000:.3f} ms")
+    print(f"render: {render_total / n * 1000:.3f} ms")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="main.py", description="Static site generator")
+    sub = parser.add_subparsers(dest="command")
+
+    build = sub.add_parser("build", help="copy static files and generate pages")
+    build.add_argument("--static", default=DEFAULT_STATIC)
+    build.add_argument("--content", default=DEFAULT_CONTENT)
+    build.add_argument("--template", default=DEFAULT_TEMPLATE)
+    build.add_argument("--dest", default=DEFAULT_DEST)
+    build.add_argument("--minify", action="store_true", help="minify generated HTML")
+    build.add_argument("--minify-css", action="store_true", help="minify stylesheets copied from STATIC")
+    build.add_argument(
+        "--inline-css",
+        action="store_true",
+        help="inline the stylesheet rules each page uses into its head instead of linking them",
+    )
+    build.add_argument("--keep", type=int, default=2, help="generations to keep for rollback")
+    build.add_argument("--drafts", action="store_true", help="also render draft pages")
+    build.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    build.add_argument("--full", action="store_true", help="re-render every page")
+    build.add_argument(
+        "--diff-manifest",
+        metavar="PATH",
+        help="where to write added/changed/removed paths (default: CACHE_DIR/deploy-diff.json)",
+    )
+    build.add_argument(
+        "--only",
+        action="append",
+        metavar="SELECTOR",
+        help="render only pages matching this path or glob (e.g. 'docs/api/**'), and publish them as a new generation",
+    )
+    build.add_argument(
+        "--archive",
+        metavar="PATH",
+        help="write the site into a .tar, .tar.gz/.tgz or .zip file instead of DEST",
+    )
+    build.add_argument("--archive-format", choices=("tar", "tar.gz", "zip"), help="override the archive's format")
+    build.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        metavar="N",
+        help="build the blocks of very large pages across N processes",
+    )
+    build.add_argument("--mem-report", action="store_true", help="trace and report peak memory per page")
+    build.add_argument("--mem-top", type=int, default=10, metavar="N", help="pages to list in the memory report")
+    build.add_argument("--page-mem-budget", type=float, metavar="MB", help="peak memory allowed per page render")
+    build.add_argument(
+        "--over-budget",
+        choices=("stream", "fail"),
+        default="stream",
+        help="re-render pages over the budget block by block, or fail the build",
+    )
+    build.set_defaults(func=cmd_build)
+
+    copy = sub.add_parser("copy", help="copy static files only")
+    copy.add_argument("--static", default=DEFAULT_STATIC)
+    copy.add_argument("--dest", default=DEFAULT_DEST)
+    copy.add_argument("--keep", type=int, default=2, help="generations to keep for rollback")
+    copy.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    copy.add_argument("--minify-css", action="store_true", help="minify stylesheets while copying")
+    copy.set_defaults(func=cmd_copy)
+
+    rollback = sub.add_parser("rollback", help="serve the previous generation again")
+    rollback.add_argument("--dest", default=DEFAULT_DEST)
+    rollback.set_defaults(func=cmd_rollback)
+
+    list_pages = sub.add_parser("list", help="list pages from front matter only")
+    list_pages.add_argument("--content", default=DEFAULT_CONTENT)
+    list_pages.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    list_pages.add_argument("--tag")
+    list_pages.add_argument("--drafts", action="store_true")
+    list_pages.set_defaults(func=cmd_list)
+
+    serve = sub.add_parser("serve", help="preview pages rendered on demand, in memory")
+    serve.add_argument("--static", default=DEFAULT_STATIC)
+    serve.add_argument("--content", default=DEFAULT_CONTENT)
+    serve.add_argument("--template", default=DEFAULT_TEMPLATE)
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8888)
+    serve.add_argument("--cache-size", type=int, default=256, help="pages kept warm")
+    serve.set_defaults(func=cmd_serve)
+
+    render = sub.add_parser("render", help="render a markdown file to HTML on stdout")
+    render.add_argument("file")
+    render.add_argument("--minify", action="store_true")
+    render.set_defaults(func=cmd_render)
+
+    bench = sub.add_parser("bench", help="time parsing and serialization")
+    bench.add_argument("file", nargs="?")
+    bench.add_argument("-n", "--iterations", type=int, default=20)
+    bench.set_defaults(func=cmd_bench)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    if argv is None:
+        argv = sys.argv[1:]
+    # No subcommand keeps the original behaviour: a plain copy of static/
+    # over public/, without generations, a manifest or a deploy diff
+    if not argv:
+        from copystatic import copy_static_to_public
+
+        copy_static_to_public(DEFAULT_STATIC, DEFAULT_DEST)
+        return 0
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 2
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,10 @@ from enum import Enum
 from htmlnode import LeafNode, ParentNode
 import re
 
-from inline_markdown import text_to_textnodes
+from highlight import CACHE_LIMIT as HIGHLIGHT_CACHE_LIMIT
+from highlight import precompute as precompute_highlights
+from highlight import highlight
+from inline_markdown import Definitions, definitions_scope, text_to_textnodes
 from textnode import text_node_to_html_node
 
 class BlockType(Enum):
@@ -14,18 +17,53 @@ class BlockType(Enum):
     ULIST = "unordered_list"
 
 
-def markdown_to_blocks(markdown):
+# `[label]: url "optional title"` and `[^note]: footnote text`
+_LINK_DEFINITION_PATTERN = re.compile(r"^ {0,3}\[([^\]\^][^\]]*)\]:[ \t]*(\S+)(?:[ \t]+\"[^\"]*\")?[ \t]*$")
+_FOOTNOTE_DEFINITION_PATTERN = re.compile(r"^ {0,3}\[\^([^\]\s]+)\]:[ \t]*(.*)$")
+
+
+def _collect_definitions(block, definitions):
+    """Move definition lines from `block` into `definitions`; return the rest."""
+    kept = []
+    for line in block.split("\n"):
+        m = _LINK_DEFINITION_PATTERN.match(line)
+        if m:
+            definitions.add_link(m.group(1), m.group(2))
+            continue
+        m = _FOOTNOTE_DEFINITION_PATTERN.match(line)
+        if m:
+            definitions.add_footnote(m.group(1), m.group(2).strip())
+            continue
+        kept.append(line)
+    return "\n".join(kept).strip()
+
+
+def markdown_to_blocks(markdown, definitions=None):
     """
     Convert a markdown string into a list of block elements.
 
     Args:
         markdown (str): The markdown content to be converted.
+        definitions (Definitions, optional): If given, reference-link and
+            footnote definition lines are removed from the blocks and
+            recorded here instead.
 
     Returns:
         list: A list of block elements representing the markdown content.
     """
     blocks = markdown.split('\n\n')
     blocks = [block.strip() for block in blocks if block.strip()]
+
+    if definitions is not None:
+        collected = []
+        for block in blocks:
+            # Cheap substring test keeps the common path a single scan
+            if "]:" in block and not block.startswith("```"):
+                block = _collect_definitions(block, definitions)
+                if not block:
+                    continue
+            collected.append(block)
+        blocks = collected
     
     return blocks
 
@@ -34,24 +72,19 @@ def block_to_block_type(block):
     """
     Determine the block type of a given markdown block.
 
+    Only the detectors registered for the block's first character are
+    consulted, so the cost doesn't grow with the number of block types.
+
     Args:
         block (str): The markdown block.
 
     Returns:
-        BlockType: The type of the block.
-    """
-    if block.startswith('#'):
-        return BlockType.HEADING
-    elif block.startswith('>'):
-        return BlockType.QUOTE
-    elif block.startswith('- ') or block.startswith('* '):
-        return BlockType.ULIST
-    elif block[0].isdigit() and block[1:3] == '. ':
-        return BlockType.OLIST
-    elif block.startswith('```') and block.endswith('```'):
-        return BlockType.CODE
-    else:
-        return BlockType.PARAGRAPH
+        BlockType: The type of the block (or a registered custom type).
+    """
+    for btype, match in _BLOCK_DETECTORS.get(block[0], ()):
+        if match is None or match(block):
+            return btype
+    return BlockType.PARAGRAPH
     
 # ==== Inline conversion hook ====
 def text_to_children(text: str):
@@ -66,8 +99,16 @@ def text_to_children(text: str):
 
 
 # ==== Block builders ====
+# Each pattern is anchored and has a single variable-length run before the
+# captured remainder, so a match attempt is linear in the line length.
+_HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*)$", flags=re.DOTALL)
+_QUOTE_MARKER_PATTERN = re.compile(r"^\s*>\s?")
+_ULIST_ITEM_PATTERN = re.compile(r"^\s*[-*]\s+(.*)$")
+_OLIST_ITEM_PATTERN = re.compile(r"^\s*\d+\.\s+(.*)$")
+
+
 def _build_heading(block: str) -> ParentNode:
-    m = re.match(r"^(#{1,6})\s+(.*)$", block, flags=re.DOTALL)
+    m = _HEADING_PATTERN.match(block)
     if not m:
         # Fallback to paragraph if malformed
         return _build_paragraph(block)
@@ -80,7 +121,7 @@ def _strip_quote_markers(block: str) -> str:
     lines = []
     for ln in block.splitlines():
         # Remove one leading '>' and an optional space following it
-        ln = re.sub(r"^\s*>\s?", "", ln)
+        ln = _QUOTE_MARKER_PATTERN.sub("", ln)
         lines.append(ln)
     return "\n".join(lines).strip()
 
@@ -99,7 +140,7 @@ def _build_quote(block: str) -> ParentNode:
 def _build_ulist(block: str) -> ParentNode:
     items = []
     for ln in block.splitlines():
-        m = re.match(r"^\s*[-*]\s+(.*)$", ln)
+        m = _ULIST_ITEM_PATTERN.match(ln)
         if not m:
             # Skip malformed lines in a UL block
             continue
@@ -111,7 +152,7 @@ def _build_ulist(block: str) -> ParentNode:
 def _build_olist(block: str) -> ParentNode:
     items = []
     for ln in block.splitlines():
-        m = re.match(r"^\s*\d+\.\s+(.*)$", ln)
+        m = _OLIST_ITEM_PATTERN.match(ln)
         if not m:
             continue
         txt = m.group(1).strip()
@@ -119,14 +160,8 @@ def _build_olist(block: str) -> ParentNode:
     return ParentNode("ol", items)
 
 
-def _build_code(block: str) -> ParentNode:
-    """
-    Parse fenced code block:
-    ```lang
-    code...
-    ```
-    No inline parsing inside code.
-    """
+def _parse_code_fence(block: str):
+    """Return (lang, code_text) for a fenced code block, or None if malformed."""
     lines = block.splitlines()
     if len(lines) >= 2 and lines[0].startswith("```") and lines[-1].startswith("```"):
         fence_open = lines[0]
@@ -134,9 +169,28 @@ def _build_code(block: str) -> ParentNode:
         code_text = "\n".join(lines[1:-1])
         if not code_text.endswith("\n"):
             code_text += "\n"
-    else:
+        return lang, code_text
+    return None
+
+
+def _build_code(block: str) -> ParentNode:
+    """
+    Parse fenced code block:
+    ```lang
+    code...
+    ```
+    No inline parsing inside code. Supported languages are highlighted
+    server-side (escaped, with token spans); others are emitted as-is.
+    """
+    fence = _parse_code_fence(block)
+    if fence is None:
         # Not a proper fence; treat as paragraph fallback
         return _build_paragraph(block)
+    lang, code_text = fence
+
+    highlighted = highlight(lang, code_text) if lang else None
+    if highlighted is not None:
+        code_text = highlighted
 
     code_props = {"class": f"language-{lang}"} if lang else None
     code_node = LeafNode("code", code_text, code_props)
@@ -149,31 +203,230 @@ def _build_paragraph(block: str) -> ParentNode:
     return ParentNode("p", text_to_children(text))
 
 
+# ==== Block type registry ====
+# block type -> builder(block) -> HTMLNode
+_BLOCK_BUILDERS = {}
+# first character -> [(block type, match(block) -> bool or None), ...]
+_BLOCK_DETECTORS = {}
+
+
+def register_block_type(block_type, builder, first_chars, match=None):
+    """
+    Register a block type so markdown_to_html_node can detect and build it.
+
+    Args:
+        block_type: Any hashable identifier (the built-ins use BlockType).
+        builder: Callable taking the block string and returning an HTMLNode.
+        first_chars (str): Every character a block of this type can start
+            with; dispatch is keyed on the block's first character.
+        match: Optional callable taking the block and returning whether it
+            really is of this type. Without it, the first character decides.
+
+    Later registrations are tried before earlier ones for the same first
+    character, so they can refine or override the built-ins.
+    """
+    _BLOCK_BUILDERS[block_type] = builder
+    for ch in first_chars:
+        _BLOCK_DETECTORS.setdefault(ch, []).insert(0, (block_type, match))
+
+
+def _is_ulist(block):
+    return block[1:2] == " "
+
+
+def _is_olist(block):
+    return block[1:3] == ". "
+
+
+def _is_code(block):
+    return block.startswith("```") and block.endswith("```")
+
+
+register_block_type(BlockType.CODE, _build_code, "`", _is_code)  # special: no inline parsing
+register_block_type(BlockType.OLIST, _build_olist, "0123456789", _is_olist)
+register_block_type(BlockType.ULIST, _build_ulist, "-*", _is_ulist)
+register_block_type(BlockType.QUOTE, _build_quote, ">")
+register_block_type(BlockType.HEADING, _build_heading, "#")
+_BLOCK_BUILDERS[BlockType.PARAGRAPH] = _build_paragraph
+
+
 # ==== Public: markdown_to_html_node ====
-def markdown_to_html_node(markdown: str) -> ParentNode:
+def _build_footnotes(definitions):
+    items = []
+    for note_id, (_, text) in definitions.footnotes.items():
+        backref = LeafNode("a", "↩", {"href": f"#fnref-{note_id}"})
+        children = text_to_children(text)
+        children.append(LeafNode(None, " "))
+        children.append(backref)
+        items.append(ParentNode("li", children, {"id": f"fn-{note_id}"}))
+    return ParentNode("section", [ParentNode("ol", items)], {"class": "footnotes"})
+
+
+def _number_footnote_refs(node, citations):
     """
-    Convert a full Markdown string to a single parent HTML node (a <div>)
-    whose children are the per-block HTML trees.
+    Suffix the ids of repeated references to one footnote (fnref-x,
+    fnref-x-2, ...) so each stays unique; the backref in the footnotes
+    section points at the first. `citations` counts references per note
+    across the blocks of a document.
     """
-    blocks = markdown_to_blocks(markdown)
-    children = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        children = current.children
+        if not children:
+            continue
+        if current.tag == "sup" and len(children) == 1 and children[0].tag == "a":
+            props = children[0].props or {}
+            if props.get("id", "").startswith("fnref-"):
+                note_id = props["href"][len("#fn-"):]
+                count = citations.get(note_id, 0) + 1
+                citations[note_id] = count
+                if count > 1:
+                    props["id"] = f"fnref-{note_id}-{count}"
+                continue
+        stack.extend(reversed(children))
+
+
+def iter_block_nodes(markdown: str, workers=1):
+    """
+    Yield the HTML tree of each block in turn, followed by the footnotes
+    section if the document defines any. `workers` is passed on to
+    highlight.precompute.
+
+    Callers that serialize each tree as it arrives only ever hold one
+    block's tree in memory, which is how large pages are streamed.
+    """
+    definitions = Definitions()
+    blocks = markdown_to_blocks(markdown, definitions)
+
+    # Warm the highlight cache for the fenced snippets ahead of building
+    # them, so pages with many code blocks can have them highlighted in
+    # parallel when the caller allows worker processes. Warming goes one
+    # cache's worth at a time, so a page with more snippets than the cache
+    # holds doesn't evict its own results before they are used.
+    snippets = []
+    for i, block in enumerate(blocks):
+        if block.startswith("```"):
+            fence = _parse_code_fence(block)
+            if fence is not None and fence[0]:
+                snippets.append((i, fence))
+    warmed = 0
+
+    builders = _BLOCK_BUILDERS
+    citations = {} if definitions.footnotes else None
+    for i, block in enumerate(blocks):
+        if warmed < len(snippets) and snippets[warmed][0] <= i:
+            window = snippets[warmed : warmed + HIGHLIGHT_CACHE_LIMIT]
+            precompute_highlights([fence for _, fence in window], workers)
+            warmed += len(window)
+        builder = builders.get(block_to_block_type(block), _build_paragraph)
+        with definitions_scope(definitions):
+            node = builder(block)
+        if citations is not None:
+            _number_footnote_refs(node, citations)
+        yield node
+    if definitions.footnotes:
+        with definitions_scope(definitions):
+            node = _build_footnotes(definitions)
+        _number_footnote_refs(node, citations)
+        yield node
+
+
+# Below this many characters, a process pool costs more than it saves.
+PARALLEL_THRESHOLD = 256 * 1024
+
 
+def _chunk_blocks(blocks, n):
+    """Split `blocks` into at most `n` contiguous runs of similar text size."""
+    target = max(1, -(-sum(len(b) for b in blocks) // n))
+    chunks = []
+    current = []
+    size = 0
     for block in blocks:
-        btype = block_to_block_type(block)
-
-        if btype == BlockType.HEADING:
-            node = _build_heading(block)
-        elif btype == BlockType.QUOTE:
-            node = _build_quote(block)
-        elif btype == BlockType.ULIST:
-            node = _build_ulist(block)
-        elif btype == BlockType.OLIST:
-            node = _build_olist(block)
-        elif btype == BlockType.CODE:
-            node = _build_code(block)  # special: no inline parsing
-        else:
-            node = _build_paragraph(block)
-
-        children.append(node)
+        current.append(block)
+        size += len(block)
+        if size >= target:
+            chunks.append(current)
+            current = []
+            size = 0
+    if current:
+        chunks.append(current)
+    return chunks
 
+
+def _build_chunk(args):
+    """
+    Worker side of the parallel render: build a run of blocks and return
+    them as a snapshot, with the worker's pid and traced peak memory.
+    """
+    import os
+    import tracemalloc
+
+    from snapshot import dump_tree
+
+    blocks, definitions, trace = args
+    if trace:
+        # A forked worker inherits the parent's tracing and its traces;
+        # restart so the peak only covers this chunk.
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        tracemalloc.start()
+    builders = _BLOCK_BUILDERS
+    with definitions_scope(definitions):
+        nodes = [builders.get(block_to_block_type(b), _build_paragraph)(b) for b in blocks]
+    data = dump_tree(ParentNode("div", nodes))
+    peak = None
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return data, os.getpid(), peak
+
+
+def _parallel_html_node(markdown, workers, worker_peaks):
+    from concurrent.futures import ProcessPoolExecutor
+
+    from snapshot import load_tree
+
+    definitions = Definitions()
+    blocks = markdown_to_blocks(markdown, definitions)
+    chunks = _chunk_blocks(blocks, workers * 2)
+    trace = worker_peaks is not None
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks) or 1)) as pool:
+        results = list(pool.map(_build_chunk, [(chunk, definitions, trace) for chunk in chunks]))
+
+    children = []
+    for data, pid, peak in results:
+        children.extend(load_tree(data).children)
+        if trace:
+            worker_peaks[str(pid)] = max(peak, worker_peaks.get(str(pid), 0))
+    if definitions.footnotes:
+        with definitions_scope(definitions):
+            children.append(_build_footnotes(definitions))
+        # Chunks are built apart, so repeated references are numbered here
+        _number_footnote_refs(ParentNode("div", children), {})
     return ParentNode("div", children)
+
+
+def markdown_to_html_node(markdown: str, workers=1, threshold=PARALLEL_THRESHOLD, worker_peaks=None) -> ParentNode:
+    """
+    Convert a full Markdown string to a single parent HTML node (a <div>)
+    whose children are the per-block HTML trees.
+
+    Reference-link and footnote definitions are collected while splitting
+    blocks and resolved as inline nodes are produced; footnotes are
+    appended in a closing <section class="footnotes">.
+
+    With `workers` > 1 (None for one per CPU), documents of at least
+    `threshold` characters have their blocks built in a process pool, in
+    contiguous chunks that are stitched back in order. Workers receive the
+    document's definitions and return snapshot bytes. If `worker_peaks` is
+    a dict, it is filled with each worker's traced peak memory by pid.
+    Block types must be registered at import time to be seen by workers.
+    """
+    if workers is None:
+        import os
+
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(markdown) >= threshold:
+        return _parallel_html_node(markdown, workers, worker_peaks)
+    return ParentNode("div", list(iter_block_nodes(markdown, workers)))
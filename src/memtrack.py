@@ -0,0 +1,129 @@
+"""
+Optional memory accounting for builds.
+
+A MemoryTracker uses tracemalloc to record the peak memory each page's
+render (markdown_to_html_node + to_html) allocates, reports the worst
+offenders, and can enforce a per-page budget: a page over budget either
+fails the build or is re-rendered in streaming mode, which only holds
+one block's tree at a time.
+"""
+
+import tracemalloc
+
+FAIL = "fail"
+STREAM = "stream"
+POLICIES = (FAIL, STREAM)
+
+
+class MemoryBudgetExceeded(ValueError):
+    pass
+
+
+def _rusage_peaks():
+    """Peak RSS in bytes of this process and of its largest child, if known."""
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    import sys
+
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return own, children
+
+
+class MemoryTracker:
+    """
+    Args:
+        budget: Per-page peak allowance in bytes, or None for no limit.
+        policy: What to do with a page over budget: "stream" to re-render
+            it in streaming mode, or "fail" to raise MemoryBudgetExceeded.
+    """
+
+    def __init__(self, budget=None, policy=STREAM):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown over-budget policy: {policy}")
+        self.budget = budget
+        self.policy = policy
+        # page -> peak bytes of the render that was kept
+        self.pages = {}
+        self.streamed = []
+        # page -> peak bytes reported by a worker process
+        self.workers = {}
+        # Highest traced memory of this process seen during any render
+        self.peak = 0
+        self._started = False
+        # Largest peak-bytes per source character seen so far
+        self._max_ratio = 0.0
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+
+    def stop(self):
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def _measure(self, fn):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        result = fn()
+        # reset_peak() above discards earlier pages' peaks, so keep the max here
+        traced = tracemalloc.get_traced_memory()[1]
+        self.peak = max(self.peak, traced)
+        return result, max(traced - baseline, 0)
+
+    def render(self, page, size, full, streaming):
+        """
+        Run `full()` for `page` (whose source is `size` characters) under
+        measurement, falling back to `streaming()` per the budget policy.
+        When earlier pages predict that `page` will exceed the budget, the
+        full render is skipped.
+        """
+        self.start()
+        predicted = size * self._max_ratio
+        if self.budget is not None and self.policy == STREAM and predicted > self.budget:
+            result, peak = self._measure(streaming)
+            self.streamed.append(page)
+            self.pages[page] = peak
+            return result
+
+        result, peak = self._measure(full)
+        if size:
+            self._max_ratio = max(self._max_ratio, peak / size)
+        if self.budget is not None and peak > self.budget:
+            if self.policy == FAIL:
+                raise MemoryBudgetExceeded(
+                    f"{page} peaked at {peak} bytes, over the {self.budget} byte budget"
+                )
+            result, peak = self._measure(streaming)
+            self.streamed.append(page)
+        self.pages[page] = peak
+        return result
+
+    def record_worker(self, name, peak):
+        self.workers[name] = max(peak, self.workers.get(name, 0))
+
+    def top(self, n=10):
+        return sorted(self.pages.items(), key=lambda item: item[1], reverse=True)[:n]
+
+    def report(self, n=10):
+        """Human-readable summary of the heaviest pages and processes."""
+        lines = [f"Peak memory of the {min(n, len(self.pages))} heaviest pages:"]
+        for page, peak in self.top(n):
+            note = " (streamed)" if page in self.streamed else ""
+            lines.append(f"  {peak / 1024:10.1f} KiB  {page}{note}")
+        if self.pages:
+            lines.append(f"Build process traced peak: {self.peak / 1024:.1f} KiB")
+        for name, peak in sorted(self.workers.items(), key=lambda item: item[1], reverse=True):
+            lines.append(f"Worker {name} traced peak: {peak / 1024:.1f} KiB")
+        own, children = _rusage_peaks()
+        if own is not None:
+            lines.append(f"Build process max RSS: {own / 1024:.1f} KiB")
+        if children:
+            lines.append(f"Largest worker process max RSS: {children / 1024:.1f} KiB")
+        return "\n".join(lines)
@@ -0,0 +1,142 @@
+"""
+Write-avoiding output tree and deploy diff manifests.
+
+Every file a build produces goes through an OutputTree, which hashes the
+bytes and compares them with the manifest of the previous generation.
+Unchanged files are hard-linked from the previous generation (or, when
+writing in place, left alone) so their mtimes survive; only new or
+changed bytes are written. The resulting manifest, and the diff of
+added, changed and removed paths, tell deploy tooling exactly what to
+upload and purge.
+"""
+
+import hashlib
+import json
+import os
+
+
+def load_manifest(path):
+    """{relative path: sha256 hex} from a manifest file, or {} if missing."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get("files", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_json(path, data):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+class OutputTree:
+    """
+    Build outputs rooted at `root`.
+
+    Args:
+        root: Directory the outputs belong in.
+        previous: Previous generation to link unchanged files from, if any.
+        manifest: {relative path: sha256} describing what's already
+            published (in `previous`, or in `root` itself when in_place).
+        in_place: Whether `root` already holds the published files
+            (such as a hard-linked clone of the live generation) and is
+            updated over them, rather than being a fresh generation.
+    """
+
+    # Recorded in the dependency index: outputs of one format can't be
+    # reused by a build of another
+    format = "dir"
+
+    def __init__(self, root, previous=None, manifest=None, in_place=False):
+        self.root = root
+        self.previous = previous
+        self.old = manifest or {}
+        self.in_place = in_place
+        self.files = {}
+        self.written = 0
+        self.kept = 0
+
+    def relpath(self, path):
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def mkdir(self, path):
+        os.makedirs(path, exist_ok=True)
+
+    def _keep_unchanged(self, rel, digest):
+        if self.old.get(rel) != digest:
+            return False
+        dest = os.path.join(self.root, rel)
+        if self.in_place:
+            return os.path.isfile(dest)
+        if self.previous is None:
+            return False
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        try:
+            os.link(os.path.join(self.previous, rel), dest)
+        except OSError:
+            return False
+        return True
+
+    def write_bytes(self, path, data):
+        """
+        Write `data` to `path` (inside root) unless identical bytes are
+        already published there. Returns True if bytes were written.
+        """
+        rel = self.relpath(path)
+        digest = hashlib.sha256(data).hexdigest()
+        self.files[rel] = digest
+        if self._keep_unchanged(rel, digest):
+            self.kept += 1
+            return False
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp-{os.getpid()}"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        self.written += 1
+        return True
+
+    def write_text(self, path, text):
+        return self.write_bytes(path, text.encode("utf-8"))
+
+    def copy(self, src, path):
+        with open(src, "rb") as f:
+            data = f.read()
+        written = self.write_bytes(path, data)
+        if written:
+            # Keep the source's timestamps, as shutil.copy2 would
+            st = os.stat(src)
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        return written
+
+    def reuse(self, path):
+        """
+        Carry `path` over unchanged from the previous generation without
+        re-rendering it. Returns False if there is nothing to reuse.
+        """
+        rel = self.relpath(path)
+        digest = self.old.get(rel)
+        if digest is None or not self._keep_unchanged(rel, digest):
+            return False
+        self.files[rel] = digest
+        self.kept += 1
+        return True
+
+    def manifest(self):
+        """Manifest of the tree after this build."""
+        if self.in_place:
+            return {**self.old, **self.files}
+        return dict(self.files)
+
+    def diff(self):
+        """Paths added, changed and removed relative to the old manifest."""
+        added = sorted(rel for rel in self.files if rel not in self.old)
+        changed = sorted(rel for rel, digest in self.files.items() if rel in self.old and self.old[rel] != digest)
+        removed = [] if self.in_place else sorted(rel for rel in self.old if rel not in self.files)
+        return {"added": added, "changed": changed, "removed": removed}
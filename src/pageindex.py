@@ -0,0 +1,111 @@
+"""
+Persistent index of page metadata.
+
+Scanning stats every markdown file under the content directory but only
+reads the front matter of files whose mtime or size changed since the
+index was saved, and never parses page bodies. Listing pages, tag pages
+and navigation can be generated from the index alone.
+"""
+
+import json
+import os
+import sys
+
+from frontmatter import is_draft, read_header
+
+INDEX_FILE = "pages.json"
+# 2: `title` is no longer coerced to a boolean or integer
+INDEX_VERSION = 2
+
+
+class PageIndex:
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        # Pages left out of the last scan because their header is broken
+        self.skipped = []
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved index, or start an empty one if it's missing or stale."""
+        index = cls(path)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+        if data.get("version") == INDEX_VERSION:
+            index.entries = data.get("pages", {})
+        return index
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "pages": self.entries}, f)
+        os.replace(tmp, self.path)
+
+    def scan(self, content_dir):
+        """
+        Bring the index up to date with `content_dir`. A file whose front
+        matter can't be parsed is reported, listed in `skipped` and left
+        out of the index.
+
+        Returns:
+            int: how many headers had to be (re)read.
+        """
+        seen = set()
+        reread = 0
+        self.skipped = []
+        stack = [content_dir]
+        while stack:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        stack.append(entry.path)
+                        continue
+                    if not entry.name.endswith(".md"):
+                        continue
+                    rel = os.path.relpath(entry.path, content_dir).replace(os.sep, "/")
+                    st = entry.stat()
+                    cached = self.entries.get(rel)
+                    if cached and cached["mtime_ns"] == st.st_mtime_ns and cached["size"] == st.st_size:
+                        seen.add(rel)
+                        continue
+                    reread += 1
+                    try:
+                        meta = read_header(entry.path)
+                    except ValueError as e:
+                        # One broken header shouldn't take the whole site down
+                        print(f"Skipping {entry.path}: {e}", file=sys.stderr)
+                        self.skipped.append(rel)
+                        continue
+                    seen.add(rel)
+                    self.entries[rel] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "meta": meta}
+        for rel in list(self.entries):
+            if rel not in seen:
+                del self.entries[rel]
+        return reread
+
+    def pages(self, include_drafts=False):
+        """(relative path, meta) pairs sorted by path, drafts excluded by default."""
+        return [
+            (rel, entry["meta"])
+            for rel, entry in sorted(self.entries.items())
+            if include_drafts or not is_draft(entry["meta"])
+        ]
+
+    def by_tag(self, include_drafts=False):
+        tags = {}
+        for rel, meta in self.pages(include_drafts):
+            for tag in meta.get("tags") or []:
+                tags.setdefault(tag, []).append(rel)
+        return tags
+
+    def recent(self, limit=10, include_drafts=False):
+        """Pages with a `date`, newest first."""
+        dated = [(rel, meta) for rel, meta in self.pages(include_drafts) if meta.get("date")]
+        dated.sort(key=lambda item: str(item[1]["date"]), reverse=True)
+        return dated[:limit]
@@ -0,0 +1,203 @@
+"""
+In-memory preview server.
+
+Pages are rendered on request from the content directory and static files
+are served straight from their source paths; nothing is written to disk.
+Parsed trees and rendered HTML stay warm in an LRU cache and are
+invalidated when the page, its template or any partial changes on disk,
+so a request only ever costs the one page it asks for.
+"""
+
+import mimetypes
+import os
+import posixpath
+import shutil
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+from frontmatter import split_front_matter
+from gencontent import extract_title, fill_template, load_template
+from markdown_blocks import markdown_to_html_node
+
+DEFAULT_CACHE_SIZE = 256
+
+
+def _fingerprint(paths):
+    stamps = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            stamps.append((path, None))
+        else:
+            stamps.append((path, st.st_mtime_ns, st.st_size))
+    return tuple(stamps)
+
+
+class RenderedPage:
+    def __init__(self, fingerprint, node, html):
+        self.fingerprint = fingerprint
+        self.node = node
+        self.html = html
+
+
+class PageCache:
+    """Thread-safe LRU of RenderedPage keyed by markdown source path."""
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """The cached page, if it is still fresh on disk."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            paths = [stamp[0] for stamp in entry.fingerprint]
+        if _fingerprint(paths) != entry.fingerprint:
+            with self._lock:
+                self._entries.pop(key, None)
+                self.misses += 1
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class PreviewSite:
+    """Maps request paths to pages or static files and renders on demand."""
+
+    def __init__(self, static, content, template, cache_size=DEFAULT_CACHE_SIZE):
+        self.static = os.path.abspath(static)
+        self.content = os.path.abspath(content)
+        self.template = template
+        self.cache = PageCache(cache_size)
+
+    def _within(self, root, rel):
+        path = os.path.normpath(os.path.join(root, *rel.split("/")))
+        if path != root and not path.startswith(root + os.sep):
+            return None
+        return path
+
+    def resolve(self, url_path):
+        """
+        Returns:
+            tuple: ("page", markdown path), ("static", file path) or
+            (None, None) when nothing matches.
+        """
+        rel = posixpath.normpath(unquote(url_path)).lstrip("/")
+        if rel in ("", "."):
+            rel = "index.html"
+        elif url_path.endswith("/"):
+            rel += "/index.html"
+
+        static_path = self._within(self.static, rel)
+        if static_path and os.path.isfile(static_path):
+            return "static", static_path
+
+        stem, ext = posixpath.splitext(rel)
+        if ext in ("", ".html"):
+            candidates = [stem + ".md"]
+            if ext == "":
+                candidates.append(rel + "/index.md")
+            for candidate in candidates:
+                md_path = self._within(self.content, candidate)
+                if md_path and os.path.isfile(md_path):
+                    return "page", md_path
+        return None, None
+
+    def render(self, md_path):
+        """Return the RenderedPage for `md_path`, from cache when fresh."""
+        entry = self.cache.get(md_path)
+        if entry is not None:
+            return entry
+
+        template, template_paths = load_template(self.template)
+        # Stat before reading, so an edit racing the render invalidates it
+        fingerprint = _fingerprint([md_path] + template_paths)
+        with open(md_path, encoding="utf-8") as f:
+            meta, markdown = split_front_matter(f.read())
+        node = markdown_to_html_node(markdown)
+        title = meta.get("title") or extract_title(markdown)
+        html = fill_template(template, title, node.to_html()).encode("utf-8")
+
+        entry = RenderedPage(fingerprint, node, html)
+        self.cache.put(md_path, entry)
+        return entry
+
+
+class PreviewHandler(BaseHTTPRequestHandler):
+    site = None
+
+    def do_HEAD(self):
+        self._serve(head=True)
+
+    def do_GET(self):
+        self._serve(head=False)
+
+    def _serve(self, head):
+        kind, path = self.site.resolve(urlparse(self.path).path)
+        if kind == "page":
+            try:
+                body = self.site.render(path).html
+            except (OSError, ValueError) as e:
+                self.send_error(500, f"render failed: {e}")
+                return
+            self._send(200, "text/html; charset=utf-8", len(body))
+            if not head:
+                self.wfile.write(body)
+        elif kind == "static":
+            ctype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            with open(path, "rb") as f:
+                self._send(200, ctype, os.fstat(f.fileno()).st_size)
+                if not head:
+                    shutil.copyfileobj(f, self.wfile)
+        else:
+            self.send_error(404)
+
+    def _send(self, status, ctype, length):
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(length))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        print(f"{self.address_string()} - {format % args}")
+
+
+def make_server(static, content, template, host="127.0.0.1", port=8888, cache_size=DEFAULT_CACHE_SIZE):
+    """Create (but don't start) a preview server for the given site."""
+    site = PreviewSite(static, content, template, cache_size)
+    handler = type("BoundPreviewHandler", (PreviewHandler,), {"site": site})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve(static, content, template, host="127.0.0.1", port=8888, cache_size=DEFAULT_CACHE_SIZE):
+    server = make_server(static, content, template, host, port, cache_size)
+    print(f"Previewing on http://{host}:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,161 @@
+"""
+Atomic publishing of the output directory.
+
+`public/` is a symlink into a sibling `.public-generations/` directory.
+A build writes a complete new generation there, then swaps the symlink
+with a single rename, so the web server never sees a missing or
+half-written tree. Previous generations are kept for instant rollback
+and older ones are removed in a background thread.
+"""
+
+import os
+import shutil
+import threading
+import time
+
+DEFAULT_KEEP = 2
+
+
+def generations_dir(dest):
+    """Directory holding every generation of `dest`, next to it."""
+    parent, name = os.path.split(os.path.abspath(dest))
+    parent = os.path.realpath(parent)
+    return os.path.join(parent, f".{name}-generations")
+
+
+def list_generations(dest):
+    """Generation directories of `dest`, oldest first."""
+    gen_dir = generations_dir(dest)
+    if not os.path.isdir(gen_dir):
+        return []
+    names = sorted(n for n in os.listdir(gen_dir) if not n.startswith("."))
+    return [os.path.join(gen_dir, n) for n in names]
+
+
+def manifest_path(generation):
+    """Where the output manifest of `generation` is stored, outside of it."""
+    gen_dir, name = os.path.split(generation)
+    return os.path.join(gen_dir, ".manifests", f"{name}.json")
+
+
+def current_generation(dest):
+    """The generation `dest` points at, or None if it isn't published yet."""
+    if not os.path.islink(dest):
+        return None
+    return os.path.realpath(dest)
+
+
+def begin_generation(dest, stamp=None):
+    """
+    Reserve a path for a new generation of `dest` and return it.
+    The directory itself is not created; the caller builds into it.
+    """
+    gen_dir = generations_dir(dest)
+    os.makedirs(gen_dir, exist_ok=True)
+    if stamp is None:
+        stamp = time.time_ns()
+    while True:
+        staging = os.path.join(gen_dir, f"{stamp:020d}")
+        if not os.path.exists(staging):
+            return staging
+        stamp += 1
+
+
+def clone_generation(source, staging):
+    """
+    Fill `staging` with hard links to every file of `source`, copying
+    where linking isn't possible. Outputs are only ever replaced, never
+    modified in place, so updating the clone leaves `source` intact.
+    """
+    for dirpath, dirnames, filenames in os.walk(source):
+        target_dir = os.path.join(staging, os.path.relpath(dirpath, source))
+        os.makedirs(target_dir, exist_ok=True)
+        for name in filenames:
+            src = os.path.join(dirpath, name)
+            dst = os.path.join(target_dir, name)
+            try:
+                os.link(src, dst)
+            except OSError:
+                shutil.copy2(src, dst)
+
+
+def discard_generation(staging):
+    """Remove a generation that failed to build."""
+    if os.path.exists(staging):
+        shutil.rmtree(staging)
+    if os.path.exists(manifest_path(staging)):
+        os.remove(manifest_path(staging))
+
+
+def _point_at(dest, target):
+    """Atomically make the `dest` symlink point at `target`."""
+    parent = os.path.dirname(os.path.abspath(dest))
+    tmp_link = os.path.join(parent, f".{os.path.basename(dest)}.swap-{os.getpid()}")
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(os.path.relpath(target, parent), tmp_link)
+    os.replace(tmp_link, dest)
+
+
+def _adopt_plain_directory(dest):
+    """
+    Move a pre-existing, non-symlink `dest` directory into the generations
+    directory. This happens once, the first time a site is published this
+    way, and is the only moment `dest` briefly doesn't exist. The adopted
+    tree sorts before every real generation, so it is the rollback target.
+    """
+    adopted = begin_generation(dest, stamp=0)
+    print(f"Moving existing directory {dest} to {adopted}")
+    os.rename(dest, adopted)
+    return adopted
+
+
+def prune_generations(dest, keep=DEFAULT_KEEP):
+    """Delete all but the newest `keep` generations, never the live one."""
+    live = current_generation(dest)
+    generations = list_generations(dest)
+    for path in generations[: max(len(generations) - keep, 0)]:
+        if path != live:
+            shutil.rmtree(path, ignore_errors=True)
+            try:
+                os.remove(manifest_path(path))
+            except OSError:
+                pass
+
+
+def commit_generation(dest, staging, keep=DEFAULT_KEEP, background=True):
+    """
+    Publish `staging` as the live `dest` and prune old generations.
+
+    Returns:
+        threading.Thread | None: the pruning thread when `background`
+        is true, so callers can join it if they need to.
+    """
+    if os.path.isdir(dest) and not os.path.islink(dest):
+        _adopt_plain_directory(dest)
+    _point_at(dest, staging)
+    print(f"Published {staging} as {dest}")
+
+    if not background:
+        prune_generations(dest, keep)
+        return None
+    thread = threading.Thread(target=prune_generations, args=(dest, keep), name="prune-generations")
+    thread.start()
+    return thread
+
+
+def rollback(dest):
+    """
+    Point `dest` back at the generation before the live one.
+
+    Returns:
+        str: the generation now being served.
+    """
+    live = current_generation(dest)
+    generations = list_generations(dest)
+    if live not in generations or generations.index(live) == 0:
+        raise ValueError(f"no previous generation to roll back to for {dest}")
+    previous = generations[generations.index(live) - 1]
+    _point_at(dest, previous)
+    print(f"Rolled back {dest} to {previous}")
+    return previous
@@ -0,0 +1,186 @@
+"""
+Compact binary snapshots of LeafNode/ParentNode trees.
+
+Layout (all integers little-endian uint32):
+
+    magic      4 bytes  b"SSGT"
+    version    uint32
+    n_strings  uint32
+    n_ints     uint32
+    lengths    n_strings * uint32   (length of each string, in characters)
+    ints       n_ints * uint32      (flat pre-order node records)
+    strings    utf-8 blob holding every string back to back
+
+Each node record is:
+
+    kind, tag, value, n_props, (name, value) * n_props, n_children
+
+where kind is 0 for a leaf and 1 for a parent, and every string field is
+an index into the string table plus one (0 means None). Strings are
+interned, so repeated tags, attribute names and values are stored once.
+
+Loading only reads integers and slices strings; no code is executed, so
+snapshots from untrusted sources are safe to load.
+"""
+
+import struct
+import sys
+from array import array
+
+from htmlnode import LeafNode, ParentNode
+
+MAGIC = b"SSGT"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sIII")
+_LEAF = 0
+_PARENT = 1
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def _uint32_array(values=()):
+    arr = array("I", values)
+    if arr.itemsize != 4:
+        arr = array("L", values)
+    return arr
+
+
+def dump_tree(node) -> bytes:
+    """Serialize a LeafNode/ParentNode tree to snapshot bytes."""
+    strings = []
+    index = {}
+    ints = []
+
+    def intern(s):
+        if s is None:
+            return 0
+        i = index.get(s)
+        if i is None:
+            strings.append(s)
+            i = index[s] = len(strings)
+        return i
+
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, ParentNode):
+            ints.append(_PARENT)
+            ints.append(intern(current.tag))
+            ints.append(0)
+        elif isinstance(current, LeafNode):
+            ints.append(_LEAF)
+            ints.append(intern(current.tag))
+            ints.append(intern(current.value))
+        else:
+            raise SnapshotError(f"cannot snapshot node type: {type(current).__name__}")
+
+        props = current.props or {}
+        ints.append(len(props))
+        for name, value in props.items():
+            ints.append(intern(name))
+            ints.append(intern(value))
+
+        children = current.children or []
+        ints.append(len(children) if isinstance(current, ParentNode) else 0)
+        stack.extend(reversed(children))
+
+    lengths = _uint32_array(len(s) for s in strings)
+    body = _uint32_array(ints)
+    if sys.byteorder == "big":
+        lengths.byteswap()
+        body.byteswap()
+
+    return b"".join(
+        [
+            _HEADER.pack(MAGIC, VERSION, len(strings), len(ints)),
+            lengths.tobytes(),
+            body.tobytes(),
+            "".join(strings).encode("utf-8"),
+        ]
+    )
+
+
+def load_tree(data: bytes):
+    """Rebuild a LeafNode/ParentNode tree from snapshot bytes."""
+    if len(data) < _HEADER.size:
+        raise SnapshotError("snapshot truncated: missing header")
+    magic, version, n_strings, n_ints = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotError("not a node snapshot")
+    if version != VERSION:
+        raise SnapshotError(f"unsupported snapshot version: {version}")
+
+    offset = _HEADER.size
+    ints_at = offset + 4 * n_strings
+    blob_at = ints_at + 4 * n_ints
+    if len(data) < blob_at:
+        raise SnapshotError("snapshot truncated")
+
+    lengths = _uint32_array()
+    lengths.frombytes(data[offset:ints_at])
+    ints = _uint32_array()
+    ints.frombytes(data[ints_at:blob_at])
+    if sys.byteorder == "big":
+        lengths.byteswap()
+        ints.byteswap()
+
+    try:
+        blob = data[blob_at:].decode("utf-8")
+    except UnicodeDecodeError as e:
+        raise SnapshotError(f"corrupt string table: {e}") from None
+
+    table = [None]
+    pos = 0
+    for length in lengths:
+        table.append(sys.intern(blob[pos : pos + length]))
+        pos += length
+    if pos != len(blob):
+        raise SnapshotError("corrupt string table: length mismatch")
+
+    root = None
+    # Each entry is (children list being filled, children still expected)
+    stack = []
+    i = 0
+    try:
+        while i < n_ints:
+            kind, tag, value, n_props = ints[i], ints[i + 1], ints[i + 2], ints[i + 3]
+            i += 4
+            props = None
+            if n_props:
+                props = {}
+                for _ in range(n_props):
+                    props[table[ints[i]]] = table[ints[i + 1]]
+                    i += 2
+            n_children = ints[i]
+            i += 1
+
+            if kind == _PARENT:
+                node = ParentNode(table[tag], [], props)
+            elif kind == _LEAF:
+                node = LeafNode(table[tag], table[value], props)
+            else:
+                raise SnapshotError(f"unknown node kind: {kind}")
+
+            if stack:
+                siblings, remaining = stack[-1]
+                siblings.append(node)
+                if remaining == 1:
+                    stack.pop()
+                else:
+                    stack[-1] = (siblings, remaining - 1)
+            elif root is None:
+                root = node
+            else:
+                raise SnapshotError("snapshot holds more than one root")
+
+            if kind == _PARENT and n_children:
+                stack.append((node.children, n_children))
+    except IndexError:
+        raise SnapshotError("snapshot truncated: node records incomplete") from None
+
+    if root is None or stack:
+        raise SnapshotError("snapshot truncated: node records incomplete")
+    return root
@@ -0,0 +1,155 @@
+"""
+Stress harness for the markdown pipeline.
+
+Generates adversarial inputs (unmatched brackets and delimiters, very long
+lines, deep quote markers, ...) at increasing sizes and checks that the
+number of function calls, peak memory and run time grow linearly with
+input size. Call counts and traced memory are deterministic, so the unit
+tests check those; run time, which also covers work done inside the
+regex engine, is only checked by the report.
+
+Run directly for a report:
+
+    python3 src/stress.py
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+
+from markdown_blocks import markdown_to_html_node
+
+# Growth allowed between two sizes, relative to the size ratio itself.
+# Linear code sits near 1.0; quadratic code at the size ratio.
+TIME_SLACK = 2.5
+# Growth allowed in the number of function calls, relative to the size
+# ratio. Calls are counted exactly, so this needs little slack.
+CALL_SLACK = 1.25
+# Peak traced memory allowed per input character.
+MEMORY_PER_CHAR = 400
+
+
+def _repeat(unit, n):
+    return unit * max(1, n // len(unit))
+
+
+GENERATORS = {
+    "open_brackets": lambda n: _repeat("[", n),
+    "open_parens": lambda n: _repeat("(", n),
+    "bracket_paren_mix": lambda n: _repeat("[a](", n),
+    "image_prefixes": lambda n: _repeat("![", n),
+    "unclosed_link_target": lambda n: "[a](" + _repeat("b", n),
+    "many_images": lambda n: _repeat("![a](b) ", n),
+    "many_links": lambda n: _repeat("[a](b) ", n),
+    "paired_underscores": lambda n: _repeat("_a_ ", n),
+    "paired_asterisks": lambda n: _repeat("**a** ", n),
+    "long_line": lambda n: _repeat("word ", n),
+    "heading_spaces": lambda n: "#" + _repeat(" ", n) + "x",
+    "heading_hashes": lambda n: _repeat("#", n),
+    "quote_markers": lambda n: _repeat(">", n),
+    "nested_quote_lines": lambda n: "\n".join(_repeat("> ", 40) + "x" for _ in range(max(1, n // 42))),
+    "ulist_spaces": lambda n: "- " + _repeat(" ", n) + "x\n-" + _repeat(" ", n),
+    "olist_digits": lambda n: "1. a\n" + _repeat("1", n),
+    "code_fence": lambda n: "```\n" + _repeat("`", n) + "\n```",
+    "blank_lines": lambda n: _repeat("a\n\n\n", n),
+}
+
+
+def random_markdown(n, seed=0):
+    """Random soup of markdown metacharacters, for fuzzing."""
+    rng = random.Random(seed)
+    alphabet = "[]()!_*`#>-1. \n\nab"
+    return "".join(rng.choice(alphabet) for _ in range(n))
+
+
+def run_pipeline(text):
+    """Render `text` end to end. Rejected markdown counts as a result too."""
+    try:
+        return markdown_to_html_node(text).to_html()
+    except ValueError:
+        return None
+
+
+def measure_time(text, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_pipeline(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def count_calls(text):
+    """Python and C function calls made while rendering `text`."""
+    calls = 0
+
+    def profile(frame, event, arg):
+        nonlocal calls
+        if event == "call" or event == "c_call":
+            calls += 1
+
+    sys.setprofile(profile)
+    try:
+        run_pipeline(text)
+    finally:
+        sys.setprofile(None)
+    return calls
+
+
+def measure_memory(text):
+    tracemalloc.start()
+    try:
+        run_pipeline(text)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def check_generator(name, small=4000, factor=8, timed=True):
+    """
+    Count calls in and trace one generator at `small` and `small * factor`
+    characters, and time it too if `timed`.
+
+    Returns:
+        dict: growth ratios and whether they fit the budgets.
+    """
+    gen = GENERATORS[name]
+    small_text = gen(small)
+    large_text = gen(small * factor)
+    call_growth = count_calls(large_text) / max(count_calls(small_text), 1)
+    peak = measure_memory(large_text)
+    per_char = peak / max(len(large_text), 1)
+    result = {
+        "name": name,
+        "call_growth": call_growth,
+        "calls_ok": call_growth <= factor * CALL_SLACK,
+        "memory_per_char": per_char,
+        "memory_ok": per_char <= MEMORY_PER_CHAR,
+    }
+    if timed:
+        # Guard against timer resolution on very fast inputs
+        growth = measure_time(large_text) / max(measure_time(small_text), 1e-4)
+        result["time_growth"] = growth
+        result["time_ok"] = growth <= factor * TIME_SLACK
+    return result
+
+
+def main(argv=None):
+    failed = False
+    for name in GENERATORS:
+        result = check_generator(name)
+        ok = result["calls_ok"] and result["time_ok"] and result["memory_ok"]
+        failed = failed or not ok
+        print(
+            f"{'ok ' if ok else 'BAD'} {name:<24} "
+            f"calls x{result['call_growth']:.1f}  "
+            f"time x{result['time_growth']:.1f}  "
+            f"mem {result['memory_per_char']:.0f} B/char"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
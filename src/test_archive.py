@@ -0,0 +1,98 @@
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from contextlib import redirect_stdout
+
+from archive import ArchiveOutput, archive_format
+from build import build_archive
+
+
+def _make_site(tmp):
+    static = os.path.join(tmp, "static")
+    content = os.path.join(tmp, "content")
+    for rel, data in [("index.css", b"body{}"), ("images/logo.png", b"\x89PNG fake"), ("z.txt", b"z")]:
+        path = os.path.join(static, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+    os.makedirs(os.path.join(content, "blog"))
+    with open(os.path.join(content, "index.md"), "w") as f:
+        f.write("# Home\n\n![logo](/images/logo.png)")
+    with open(os.path.join(content, "blog", "post.md"), "w") as f:
+        f.write("# Post\n\ntext")
+    template = os.path.join(tmp, "template.html")
+    with open(template, "w") as f:
+        f.write("<title>{{ Title }}</title>{{ Content }}")
+    return static, content, template
+
+
+class TestArchive(unittest.TestCase):
+    def test_archive_format(self):
+        self.assertEqual(archive_format("site.tgz"), "tar.gz")
+        self.assertEqual(archive_format("site.TAR.GZ"), "tar.gz")
+        self.assertEqual(archive_format("site.tar"), "tar")
+        self.assertEqual(archive_format("site.zip"), "zip")
+        with self.assertRaises(ValueError):
+            archive_format("site.rar")
+
+    def test_reproducible_builds(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            static, content, template = _make_site(tmp)
+            cache = os.path.join(tmp, "cache")
+            for name in ("site.tar", "site.tar.gz", "site.zip"):
+                archive = os.path.join(tmp, "dist", name)
+                with redirect_stdout(io.StringIO()):
+                    build_archive(static, content, template, archive, cache_dir=cache)
+                    with open(archive, "rb") as f:
+                        first = f.read()
+                    # Touching the inputs must not change the archive
+                    os.utime(os.path.join(static, "z.txt"), (1, 1))
+                    build_archive(static, content, template, archive, cache_dir=cache)
+                with open(archive, "rb") as f:
+                    self.assertEqual(f.read(), first, name)
+            self.assertEqual(sorted(os.listdir(os.path.join(tmp, "dist"))), ["site.tar", "site.tar.gz", "site.zip"])
+
+    def test_tar_contents(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            static, content, template = _make_site(tmp)
+            archive = os.path.join(tmp, "site.tar.gz")
+            with redirect_stdout(io.StringIO()):
+                build_archive(static, content, template, archive, cache_dir=os.path.join(tmp, "cache"))
+            with tarfile.open(archive) as tar:
+                files = [m.name for m in tar.getmembers() if m.isfile()]
+                self.assertEqual(
+                    files,
+                    ["images/logo.png", "index.css", "z.txt", "blog/post.html", "index.html"],
+                )
+                self.assertEqual({m.mtime for m in tar.getmembers()}, {315532800})
+                page = tar.extractfile("blog/post.html").read().decode()
+            self.assertEqual(page, "<title>Post</title><div><h1>Post</h1><p>text</p></div>")
+
+    def test_zip_stores_compressed_assets(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            static, content, template = _make_site(tmp)
+            archive = os.path.join(tmp, "site.zip")
+            with redirect_stdout(io.StringIO()):
+                build_archive(static, content, template, archive, cache_dir=os.path.join(tmp, "cache"))
+            with zipfile.ZipFile(archive) as zf:
+                info = {i.filename: i for i in zf.infolist()}
+                self.assertEqual(info["images/logo.png"].compress_type, zipfile.ZIP_STORED)
+                self.assertEqual(info["index.html"].compress_type, zipfile.ZIP_DEFLATED)
+                self.assertEqual(info["index.html"].date_time, (1980, 1, 1, 0, 0, 0))
+                self.assertEqual(zf.read("index.css"), b"body{}")
+
+    def test_failed_build_leaves_no_archive(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = os.path.join(tmp, "site.tar")
+            with self.assertRaises(ValueError):
+                with ArchiveOutput(archive) as out:
+                    out.write_text(os.path.join(out.root, "a.html"), "a")
+                    out.write_text(os.path.join(out.root, "a.html"), "again")
+            self.assertEqual(os.listdir(tmp), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from build import build_selection, build_site, select_pages
+from publish import current_generation, list_generations, rollback
+
+
+class TestPartialBuild(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        tmp = self._tmp.name
+        self.static = os.path.join(tmp, "static")
+        self.content = os.path.join(tmp, "content")
+        self.template = os.path.join(tmp, "template.html")
+        self.dest = os.path.join(tmp, "public")
+        self.cache = os.path.join(tmp, "cache")
+        self._write(self.template, "{{ Content }}")
+        self._write(os.path.join(self.static, "index.css"), "css")
+        self._write(os.path.join(self.static, "images", "api.png"), "png")
+        self._write(os.path.join(self.content, "index.md"), "# Home")
+        self._write(os.path.join(self.content, "docs", "guide.md"), "# Guide")
+        self._write(os.path.join(self.content, "docs", "api", "a.md"), "# A\n\n![x](/images/api.png)")
+        self._write(os.path.join(self.content, "docs", "api", "v2", "b.md"), "# B")
+        self._write(os.path.join(self.content, "docs", "api", "wip.md"), "---\ndraft: true\n---\n# W")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def _read(self, *parts):
+        with open(os.path.join(self.dest, *parts)) as f:
+            return f.read()
+
+    def test_select_pages(self):
+        self.assertEqual(select_pages(self.content, ["docs/api/**"]), ["docs/api/a.md", "docs/api/v2/b.md"])
+        self.assertEqual(select_pages(self.content, ["docs/api/*"]), ["docs/api/a.md"])
+        self.assertEqual(select_pages(self.content, ["/docs/api"]), ["docs/api/a.md", "docs/api/v2/b.md"])
+        self.assertEqual(select_pages(self.content, ["docs/guide.html", "index"]), ["docs/guide.md", "index.md"])
+        self.assertEqual(
+            select_pages(self.content, ["docs/api/**"], drafts=True),
+            ["docs/api/a.md", "docs/api/v2/b.md", "docs/api/wip.md"],
+        )
+        self.assertEqual(select_pages(self.content, ["nope/**"]), [])
+        for selector in ("../content/index.md", "docs/../../x/**"):
+            with self.assertRaises(ValueError):
+                select_pages(self.content, [selector])
+
+    def test_build_selection_publishes_a_generation(self):
+        with redirect_stdout(io.StringIO()):
+            with self.assertRaises(ValueError):
+                build_selection(["docs/**"], self.static, self.content, self.template, self.dest,
+                                cache_dir=self.cache)
+
+            build_site(self.static, self.content, self.template, self.dest, cache_dir=self.cache).join()
+            os.remove(os.path.join(self.dest, "images", "api.png"))
+            self._write(os.path.join(self.content, "docs", "api", "a.md"), "# A2\n\n![x](/images/api.png)")
+            self._write(os.path.join(self.content, "docs", "guide.md"), "# Guide2")
+
+            before = current_generation(self.dest)
+            pages = build_selection(["docs/api/**"], self.static, self.content, self.template, self.dest,
+                                    cache_dir=self.cache)
+
+            self.assertEqual(pages, ["docs/api/a.md", "docs/api/v2/b.md"])
+            self.assertIn("<h1>A2</h1>", self._read("docs", "api", "a.html"))
+            self.assertEqual(self._read("images", "api.png"), "png")
+            # Outside the selection nothing changed
+            self.assertEqual(self._read("docs", "guide.html"), "<div><h1>Guide</h1></div>")
+            self.assertEqual(list_generations(self.dest), [before, current_generation(self.dest)])
+
+            # The generation before the partial build was left as it was
+            self.assertEqual(rollback(self.dest), before)
+            self.assertIn("<h1>A</h1>", self._read("docs", "api", "a.html"))
+            self.assertFalse(os.path.exists(os.path.join(self.dest, "images", "api.png")))
+
+    def test_full_build_after_selection_stays_incremental(self):
+        with redirect_stdout(io.StringIO()):
+            build_site(self.static, self.content, self.template, self.dest, cache_dir=self.cache).join()
+            self._write(os.path.join(self.content, "docs", "guide.md"), "# Guide2")
+            build_selection(["docs/api/a.md"], self.static, self.content, self.template, self.dest,
+                            cache_dir=self.cache)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            build_site(self.static, self.content, self.template, self.dest, cache_dir=self.cache).join()
+        # The selected page and the edited guide; the rest is reused
+        self.assertIn("Rendered 2 pages, reused 2 unchanged", out.getvalue())
+        self.assertEqual(self._read("docs", "guide.html"), "<div><h1>Guide2</h1></div>")
+
+
+if __name__ == "__main__":
+    unittest.main()
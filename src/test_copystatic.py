@@ -0,0 +1,87 @@
+import io
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from copystatic import copy_static_to_public
+
+
+def _expected_log(src, dest):
+    """Log lines of the depth-first, listdir-ordered copy."""
+    lines = []
+    for item in os.listdir(src):
+        src_path = os.path.join(src, item)
+        dest_path = os.path.join(dest, item)
+        if os.path.isfile(src_path):
+            lines.append(f"Copied file: {src_path} → {dest_path}")
+        else:
+            lines.append(f"Entering directory: {src_path}")
+            lines.extend(_expected_log(src_path, dest_path))
+    return lines
+
+
+class TestCopyStatic(unittest.TestCase):
+    def test_copy_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "static")
+            for rel in ["a.txt", "img/b.png", "img/icons/c.svg", "css/d.css", "z.txt"]:
+                path = os.path.join(src, rel)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w") as f:
+                    f.write(rel)
+            dest = os.path.join(tmp, "public")
+
+            out = io.StringIO()
+            with redirect_stdout(out):
+                copy_static_to_public(src, dest)
+
+            self.assertEqual(out.getvalue().splitlines(), _expected_log(src, dest))
+            with open(os.path.join(dest, "img", "icons", "c.svg")) as f:
+                self.assertEqual(f.read(), "img/icons/c.svg")
+
+    def test_replaces_published_symlink(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "static")
+            os.makedirs(src)
+            with open(os.path.join(src, "a.txt"), "w") as f:
+                f.write("a")
+            generation = os.path.join(tmp, "gen")
+            os.makedirs(generation)
+            with open(os.path.join(generation, "old.txt"), "w") as f:
+                f.write("old")
+            dest = os.path.join(tmp, "public")
+            os.symlink(generation, dest)
+
+            with redirect_stdout(io.StringIO()):
+                copy_static_to_public(src, dest)
+
+            self.assertFalse(os.path.islink(dest))
+            self.assertEqual(os.listdir(dest), ["a.txt"])
+            self.assertEqual(os.listdir(generation), ["old.txt"])
+
+    def test_deeper_than_recursion_limit(self):
+        old_limit = sys.getrecursionlimit()
+        depth = 400
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "s")
+            deep = os.path.join(src, *(["d"] * depth))
+            os.makedirs(deep)
+            with open(os.path.join(deep, "leaf.txt"), "w") as f:
+                f.write("leaf")
+            dest = os.path.join(tmp, "p")
+
+            # Far below the nesting depth: any per-level recursion would fail
+            sys.setrecursionlimit(100)
+            try:
+                with redirect_stdout(io.StringIO()):
+                    copy_static_to_public(src, dest)
+            finally:
+                sys.setrecursionlimit(old_limit)
+
+            self.assertTrue(os.path.isfile(os.path.join(dest, *(["d"] * depth), "leaf.txt")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+import css
+from copystatic import copy_static_to_public
+from css import CriticalCSS, load_stylesheet, minify_css
+from gencontent import render_page
+from output import OutputTree
+
+SHEET = """
+/* base */
+body { margin: 0 ; }
+h1, h2 { color: red; }
+a:hover, .nav > a { content: "a  ;{ b" }
+pre code.language-python { padding: 0 }
+#toc li { list-style: none }
+@media (max-width: 600px) {
+  h2 { font-size: 1em }
+  blockquote { margin: 0 }
+}
+@font-face { font-family: "X"; src: url(/x.woff2) }
+"""
+
+TEMPLATE = '<html><head><link rel="stylesheet" href="/site.css"></head><body>{{ Content }}</body></html>'
+
+
+class TestMinify(unittest.TestCase):
+    def test_minify_css(self):
+        self.assertEqual(
+            minify_css('a > b , c { content : " x  /* y */ " ; width: calc(1px + 2px) ; } /* gone */'),
+            'a>b,c{content:" x  /* y */ ";width:calc(1px + 2px)}',
+        )
+        self.assertEqual(
+            minify_css('a :hover , p { color : red ; content : "{ :" } b{c : d}'),
+            'a :hover,p{color:red;content:"{ :"}b{c:d}',
+        )
+
+    def test_rebase_urls(self):
+        self.assertEqual(
+            css.rebase_urls(
+                '@import "base.css";a{background:url(../img/bg.png)}'
+                "@font-face{src:url('fonts/x.woff2') format(\"woff2\"),url(/abs.woff)}"
+                'b{content:"url(kept)";mask:url(data:image/png;base64,AA)}',
+                "/css/site.css",
+            ),
+            '@import "/css/base.css";a{background:url(/img/bg.png)}'
+            "@font-face{src:url('/css/fonts/x.woff2') format(\"woff2\"),url(/abs.woff)}"
+            'b{content:"url(kept)";mask:url(data:image/png;base64,AA)}',
+        )
+
+    def test_cached_by_content(self):
+        css.clear_cache()
+        self.assertIs(load_stylesheet(SHEET), load_stylesheet(SHEET))
+        self.assertIsNot(load_stylesheet(SHEET), load_stylesheet(SHEET + " "))
+
+
+class TestSelect(unittest.TestCase):
+    def test_select_keeps_only_matching_selectors(self):
+        sheet = load_stylesheet(SHEET)
+        self.assertEqual(
+            sheet.select({"body", "h1", "a"}, set(), set()),
+            'body{margin:0}h1{color:red}a:hover{content:"a  ;{ b"}'
+            '@font-face{font-family:"X";src:url(/x.woff2)}',
+        )
+        self.assertEqual(
+            sheet.select({"h2", "pre", "code", "li"}, {"language-python"}, {"toc"}),
+            "h2{color:red}pre code.language-python{padding:0}#toc li{list-style:none}"
+            "@media (max-width:600px){h2{font-size:1em}}"
+            '@font-face{font-family:"X";src:url(/x.woff2)}',
+        )
+
+
+class TestCriticalCSS(unittest.TestCase):
+    def test_inline_page_rules(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, "site.css"), "w") as f:
+                f.write(SHEET)
+            assets = set()
+            html, _ = render_page(
+                "# Title\n\n```python\nx = 1\n```", TEMPLATE, assets=assets, css=CriticalCSS(tmp)
+            )
+        self.assertTrue(html.startswith("<html><head><style>body{margin:0}h1{color:red}pre code.language-python"))
+        self.assertNotIn("<link", html)
+        self.assertNotIn("blockquote", html)
+        self.assertIn("/site.css", assets)
+
+    def test_relative_urls_and_style_end_tags(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "css"))
+            with open(os.path.join(tmp, "css", "site.css"), "w") as f:
+                f.write("h1 { background: url(img/h.png) }")
+            with open(os.path.join(tmp, "css", "bad.css"), "w") as f:
+                f.write('h1 { content: "</style><script>" }')
+            template = TEMPLATE.replace("/site.css", "/css/site.css")
+            html, _ = render_page("# T", template, css=CriticalCSS(tmp))
+            self.assertIn("<style>h1{background:url(/css/img/h.png)}</style>", html)
+            template = TEMPLATE.replace("/site.css", "/css/bad.css")
+            html, _ = render_page("# T", template, css=CriticalCSS(tmp))
+            self.assertIn('<link rel="stylesheet" href="/css/bad.css">', html)
+            with open(os.path.join(tmp, "css", "site.css")) as f:
+                self.assertEqual(load_stylesheet(f.read()).minified, "h1{background:url(img/h.png)}")
+
+    def test_leaves_unknown_links(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            template = TEMPLATE.replace("/site.css", "https://cdn.example/x.css")
+            html, _ = render_page("# T", template, css=CriticalCSS(tmp))
+        self.assertIn('<link rel="stylesheet" href="https://cdn.example/x.css">', html)
+
+    def test_copy_minifies_stylesheets(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            static = os.path.join(tmp, "static")
+            os.makedirs(static)
+            with open(os.path.join(static, "site.css"), "w") as f:
+                f.write(SHEET)
+            with open(os.path.join(static, "raw.txt"), "w") as f:
+                f.write("a  b")
+            dest = os.path.join(tmp, "public")
+            with redirect_stdout(io.StringIO()):
+                copy_static_to_public(static, dest, OutputTree(dest), minify_css=True)
+            with open(os.path.join(dest, "site.css")) as f:
+                self.assertEqual(f.read(), minify_css(SHEET))
+            with open(os.path.join(dest, "raw.txt")) as f:
+                self.assertEqual(f.read(), "a  b")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from build import build_site, resolve_asset
+from publish import rollback
+from depindex import DependencyIndex
+
+
+class TestDependencyIndex(unittest.TestCase):
+    def test_reverse_index_updates_incrementally(self):
+        index = DependencyIndex()
+        index.record("a.md", ["t.html", "img.png"])
+        index.record("b.md", ["t.html"])
+        self.assertEqual(index.dependents("t.html"), ["a.md", "b.md"])
+        self.assertEqual(index.affected_pages({"img.png"}), {"a.md"})
+
+        index.record("a.md", ["t.html"])
+        self.assertEqual(index.dependents("img.png"), [])
+        index.remove("b.md")
+        self.assertEqual(index.dependents("t.html"), ["a.md"])
+
+    def test_persist_and_detect_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            asset = os.path.join(tmp, "x.png")
+            with open(asset, "w") as f:
+                f.write("x")
+            path = os.path.join(tmp, "deps.json")
+            index = DependencyIndex(path)
+            index.record("p.md", [asset])
+            index.refresh([asset])
+            index.save()
+
+            loaded = DependencyIndex.load(path)
+            self.assertEqual(loaded.changed_inputs(), set())
+            os.utime(asset, ns=(1, 1))
+            self.assertEqual(loaded.changed_inputs(), {asset})
+            self.assertEqual(loaded.affected_pages(loaded.changed_inputs()), {"p.md"})
+
+    def test_resolve_asset(self):
+        self.assertEqual(resolve_asset("/images/a.png", "blog/p.md", "static"), os.path.join("static", "images", "a.png"))
+        self.assertEqual(resolve_asset("a.png", "blog/p.md", "static"), os.path.join("static", "blog", "a.png"))
+        self.assertIsNone(resolve_asset("https://example.com/a.png", "p.md", "static"))
+        self.assertIsNone(resolve_asset("/blog/other", "p.md", "static"))
+        self.assertIsNone(resolve_asset("../../etc/passwd.png", "p.md", "static"))
+
+
+class TestIncrementalBuild(unittest.TestCase):
+    def _write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def _build(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            build_site(self.static, self.content, self.template, self.dest,
+                       cache_dir=self.cache).join()
+        return out.getvalue()
+
+    def _site(self, tmp):
+        self.static = os.path.join(tmp, "static")
+        self.content = os.path.join(tmp, "content")
+        self.template = os.path.join(tmp, "template.html")
+        self.dest = os.path.join(tmp, "public")
+        self.cache = os.path.join(tmp, "cache")
+        os.makedirs(self.static, exist_ok=True)
+
+    def test_only_dependent_pages_rerender(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self._site(tmp)
+            image = os.path.join(self.static, "images", "a.png")
+            partial = os.path.join(tmp, "partials", "nav.html")
+            self._write(image, "png")
+            self._write(partial, "<nav>nav</nav>")
+            self._write(self.template, "{{> partials/nav.html }}{{ Content }}")
+            self._write(os.path.join(self.content, "a.md"), "# A\n\n![a](/images/a.png)")
+            self._write(os.path.join(self.content, "b.md"), "# B\n\ntext")
+
+            self.assertIn("Rendered 2 pages, reused 0", self._build())
+            with open(os.path.join(self.dest, "a.html")) as f:
+                self.assertEqual(f.read(), '<nav>nav</nav><div><h1>A</h1><p><img src="/images/a.png" alt="a"></img></p></div>')
+
+            self.assertIn("Rendered 0 pages, reused 2", self._build())
+
+            os.utime(image, ns=(1, 1))
+            out = self._build()
+            self.assertIn("Rendered 1 pages, reused 1", out)
+            self.assertIn("a.md", out)
+
+            self._write(partial, "<nav>new</nav>")
+            os.utime(partial, ns=(2, 2))
+            self.assertIn("Rendered 2 pages, reused 0", self._build())
+            with open(os.path.join(self.dest, "b.html")) as f:
+                self.assertTrue(f.read().startswith("<nav>new</nav>"))
+
+    def test_rebuild_after_rollback(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self._site(tmp)
+            page = os.path.join(self.content, "a.md")
+            self._write(self.template, "{{ Content }}")
+            self._write(page, "# A\n\nv1")
+            self._build()
+            self._write(page, "# A\n\nv2")
+            os.utime(page, ns=(1, 1))
+            self._build()
+            with redirect_stdout(io.StringIO()):
+                rollback(self.dest)
+            with open(os.path.join(self.dest, "a.html")) as f:
+                self.assertIn("<p>v1</p>", f.read())
+
+            self.assertIn("Rendered 1 pages, reused 0", self._build())
+            with open(os.path.join(self.dest, "a.html")) as f:
+                self.assertIn("<p>v2</p>", f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
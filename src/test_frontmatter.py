@@ -0,0 +1,101 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+
+from frontmatter import read_header, split_front_matter
+from gencontent import render_page
+from pageindex import PageIndex
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_split(self):
+        md = "---\ntitle: Hello\ndate: 2024-05-01\ntags: [a, b]\ndraft: true\ncount: 3\n---\n# Body"
+        meta, body = split_front_matter(md)
+        self.assertEqual(
+            meta,
+            {"title": "Hello", "date": "2024-05-01", "tags": ["a", "b"], "draft": True, "count": 3},
+        )
+        self.assertEqual(body, "# Body")
+
+    def test_block_list_and_quotes(self):
+        meta, _ = split_front_matter('---\ntitle: "a: b"\ntags:\n  - x\n  - y\n---\n')
+        self.assertEqual(meta, {"title": "a: b", "tags": ["x", "y"]})
+
+    def test_title_stays_a_string(self):
+        for value in ("2024", "yes", "no", "true"):
+            meta, _ = split_front_matter(f"---\ntitle: {value}\ndraft: no\n---\n# H")
+            self.assertEqual(meta, {"title": value, "draft": False})
+            html, _ = render_page(f"---\ntitle: {value}\n---\n# H", "{{ Title }}")
+            self.assertEqual(html, value)
+
+    def test_no_front_matter(self):
+        self.assertEqual(split_front_matter("# Title\n\n---\n"), ({}, "# Title\n\n---\n"))
+
+    def test_unterminated(self):
+        with self.assertRaises(ValueError):
+            split_front_matter("---\ntitle: x\n")
+
+    def test_read_header_stops_at_fence(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "p.md")
+            with open(path, "wb") as f:
+                # A body that isn't valid UTF-8 proves it's never decoded
+                f.write(b"---\ntitle: T\n---\n" + b"\xff" * 1000)
+            self.assertEqual(read_header(path), {"title": "T"})
+
+
+class TestPageIndex(unittest.TestCase):
+    def _write(self, root, rel, text):
+        path = os.path.join(root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_scan_persist_and_incremental(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            self._write(content, "index.md", "# Home")
+            self._write(content, "blog/a.md", "---\ntitle: A\ndate: 2024-01-02\ntags: [py]\n---\nbody")
+            self._write(content, "blog/b.md", "---\ntitle: B\ndate: 2024-03-04\ntags: [py, go]\n---\nbody")
+            self._write(content, "blog/draft.md", "---\ntitle: D\ndraft: true\n---\nbody")
+            index_path = os.path.join(tmp, "cache", "pages.json")
+
+            index = PageIndex.load(index_path)
+            self.assertEqual(index.scan(content), 4)
+            index.save()
+            self.assertEqual(
+                [rel for rel, _ in index.pages()],
+                ["blog/a.md", "blog/b.md", "index.md"],
+            )
+            self.assertEqual(len(index.pages(include_drafts=True)), 4)
+            self.assertEqual(index.by_tag()["go"], ["blog/b.md"])
+            self.assertEqual([rel for rel, _ in index.recent()], ["blog/b.md", "blog/a.md"])
+
+            reloaded = PageIndex.load(index_path)
+            self.assertEqual(reloaded.scan(content), 0)
+
+            path = self._write(content, "blog/a.md", "---\ntitle: A2\n---\nbody")
+            os.utime(path, ns=(1, 1))
+            os.remove(os.path.join(content, "index.md"))
+            self.assertEqual(reloaded.scan(content), 1)
+            self.assertEqual(reloaded.entries["blog/a.md"]["meta"]["title"], "A2")
+            self.assertNotIn("index.md", reloaded.entries)
+
+    def test_broken_header_is_skipped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            self._write(content, "good.md", "---\ntitle: G\n---\nbody")
+            self._write(content, "bad.md", "---\ntitle: never closed\nbody")
+            index = PageIndex()
+            with redirect_stderr(io.StringIO()) as err:
+                self.assertEqual(index.scan(content), 2)
+            self.assertEqual([rel for rel, _ in index.pages()], ["good.md"])
+            self.assertEqual(index.skipped, ["bad.md"])
+            self.assertIn("bad.md", err.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+
+from gencontent import extract_title, render_page
+
+
+class TestGenContent(unittest.TestCase):
+    def test_extract_title(self):
+        self.assertEqual(extract_title("# Hello  "), "Hello")
+        self.assertEqual(extract_title("intro\n\n## sub\n\n# Real title\n"), "Real title")
+
+    def test_extract_title_missing(self):
+        with self.assertRaises(ValueError):
+            extract_title("## only an h2")
+
+    def test_render_page(self):
+        html, saved = render_page("# T\n\ntext", "<h>{{ Title }}</h>{{ Content }}")
+        self.assertEqual(html, "<h>T</h><div><h1>T</h1><p>text</p></div>")
+        self.assertEqual(saved, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
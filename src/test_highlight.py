@@ -0,0 +1,103 @@
+import threading
+import unittest
+from unittest import mock
+
+import highlight
+from markdown_blocks import markdown_to_html_node
+
+
+class TestHighlight(unittest.TestCase):
+    def setUp(self):
+        highlight.clear_cache()
+
+    def test_python(self):
+        out = highlight.highlight("python", 'def f(x):  # add\n    return x + 1 if x else "<none>"\n')
+        self.assertEqual(
+            out,
+            '<span class="tok-kw">def</span> f(x):  <span class="tok-com"># add</span>\n'
+            '    <span class="tok-kw">return</span> x + <span class="tok-num">1</span> '
+            '<span class="tok-kw">if</span> x <span class="tok-kw">else</span> '
+            '<span class="tok-str">"&lt;none&gt;"</span>\n',
+        )
+
+    def test_json_keys(self):
+        out = highlight.highlight("json", '{"a": [1, true]}')
+        self.assertEqual(
+            out,
+            '{<span class="tok-attr">"a"</span>: [<span class="tok-num">1</span>, '
+            '<span class="tok-kw">true</span>]}',
+        )
+
+    def test_unsupported_language(self):
+        self.assertIsNone(highlight.highlight("brainfuck", "+++"))
+
+    def test_unterminated_string_is_linear(self):
+        code = '"""' * 20000
+        self.assertTrue(highlight.highlight("python", code).startswith('<span class="tok-str">'))
+
+    def test_cache(self):
+        first = highlight.highlight("js", "const x = 1;")
+        self.assertEqual(len(highlight._cache), 1)
+        self.assertIs(highlight.highlight("JS", "const x = 1;"), first)
+
+    def test_precompute_parallel(self):
+        snippets = [("python", f"x = {i}\n") for i in range(8)]
+        self.assertEqual(highlight.precompute(snippets, workers=2, threshold=4), 8)
+        self.assertEqual(highlight.precompute(snippets, workers=2, threshold=4), 0)
+        self.assertEqual(
+            highlight.highlight("python", "x = 3\n"),
+            'x = <span class="tok-num">3</span>\n',
+        )
+
+    def test_precompute_serial_by_default(self):
+        snippets = [("python", f"y = {i}\n") for i in range(8)]
+        with mock.patch("concurrent.futures.ProcessPoolExecutor", side_effect=AssertionError("forked")):
+            self.assertEqual(highlight.precompute(snippets, threshold=1), 8)
+
+    def test_cache_is_thread_safe(self):
+        errors = []
+
+        def work(offset):
+            try:
+                for i in range(2000):
+                    highlight.highlight("python", f"z = {(i + offset) % 40}\n")
+            except Exception as e:  # pragma: no cover - only on failure
+                errors.append(e)
+
+        with mock.patch.object(highlight, "CACHE_LIMIT", 8):
+            threads = [threading.Thread(target=work, args=(n * 7,)) for n in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(highlight._cache), 8)
+
+    def test_page_larger_than_cache_uses_its_precompute(self):
+        md = "\n\n".join(f"```python\nv = {i}\n```" for i in range(10))
+        calls = []
+        original = highlight._highlight_uncached
+
+        def counting(lang, code):
+            calls.append(code)
+            return original(lang, code)
+
+        with mock.patch.object(highlight, "CACHE_LIMIT", 4), \
+                mock.patch("markdown_blocks.HIGHLIGHT_CACHE_LIMIT", 4), \
+                mock.patch.object(highlight, "_highlight_uncached", counting):
+            html = markdown_to_html_node(md).to_html()
+        self.assertEqual(len(calls), 10)
+        self.assertIn('v = <span class="tok-num">9</span>', html)
+
+    def test_markdown_code_block(self):
+        md = "```bash\necho $HOME\n```"
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(
+            html,
+            '<div><pre><code class="language-bash"><span class="tok-builtin">echo</span> '
+            '<span class="tok-var">$HOME</span>\n</code></pre></div>',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
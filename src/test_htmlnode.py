@@ -1,5 +1,6 @@
+import sys
 import unittest
-from htmlnode import LeafNode, ParentNode, HTMLNode
+from htmlnode import LeafNode, ParentNode, HTMLNode, to_minified_html
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -108,6 +109,72 @@ class TestHTMLNode(unittest.TestCase):
             "<h2><b>Bold text</b>Normal text<i>italic text</i>Normal text</h2>",
         )
 
+    def test_to_html_deeper_than_recursion_limit(self):
+        depth = sys.getrecursionlimit() * 10
+        node = LeafNode("b", "x")
+        for _ in range(depth):
+            node = ParentNode("span", [node])
+        self.assertEqual(
+            node.to_html(),
+            "<span>" * depth + "<b>x</b>" + "</span>" * depth,
+        )
+
+    def test_to_html_missing_children_raises(self):
+        node = ParentNode("div", [ParentNode("p", None)])
+        with self.assertRaises(ValueError):
+            node.to_html()
+
+
+class TestMinify(unittest.TestCase):
+    def test_collapses_text_whitespace(self):
+        node = ParentNode(
+            "p",
+            [
+                LeafNode(None, "Some   spaced\n text "),
+                LeafNode("b", "bold\t\tword"),
+            ],
+        )
+        html, saved = to_minified_html(node)
+        self.assertEqual(html, "<p>Some spaced text <b>bold word</b></p>")
+        self.assertEqual(saved, len(node.to_html()) - len(html))
+
+    def test_saved_counts_utf8_bytes(self):
+        node = ParentNode("p", [LeafNode(None, "caf\u00e9  \n  \u65e5\u672c  \u8a9e")], {"lang": "fr"})
+        html, saved = to_minified_html(node)
+        self.assertEqual(html, "<p lang=fr>caf\u00e9 \u65e5\u672c \u8a9e</p>")
+        self.assertEqual(saved, len(node.to_html().encode("utf-8")) - len(html.encode("utf-8")))
+
+    def test_preserves_code_blocks(self):
+        code = "def f():\n    return  1\n"
+        node = ParentNode("pre", [LeafNode("code", code, {"class": "language-py"})])
+        html, _ = to_minified_html(node)
+        self.assertEqual(html, f"<pre><code class=language-py>{code}</code></pre>")
+
+    def test_preserves_inline_code(self):
+        node = ParentNode("p", [LeafNode("code", "a  b")])
+        self.assertEqual(node.to_html(minify=True), "<p><code>a  b</code></p>")
+
+    def test_keeps_non_breaking_space(self):
+        node = LeafNode(None, "a\u00a0\u00a0b")
+        self.assertEqual(node.to_html(minify=True), "a\u00a0\u00a0b")
+
+    def test_attribute_quotes(self):
+        node = LeafNode(
+            "img",
+            "",
+            {"src": "https://example.com/a.png", "alt": "two words", "title": ""},
+        )
+        html, saved = to_minified_html(node)
+        self.assertEqual(
+            html,
+            '<img src=https://example.com/a.png alt="two words" title=""></img>',
+        )
+        self.assertEqual(saved, 2)
+
+    def test_default_output_unchanged(self):
+        node = ParentNode("p", [LeafNode(None, "a  b")], {"class": "x"})
+        self.assertEqual(node.to_html(), '<p class="x">a  b</p>')
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -8,6 +8,8 @@ from inline_markdown import (
     extract_markdown_images,
 )
 
+import inline_markdown
+from inline_markdown import register_inline_splitter
 from textnode import TextNode, TextType
 
 
@@ -191,6 +193,24 @@ class TestInlineMarkdown(unittest.TestCase):
             nodes,
         )
 
+    def test_register_inline_splitter(self):
+        def split_mark(nodes):
+            return split_nodes_delimiter(nodes, "==", "mark")
+
+        register_inline_splitter(split_mark)
+        try:
+            self.assertListEqual(
+                text_to_textnodes("a ==b== **c**"),
+                [
+                    TextNode("a ", TextType.TEXT),
+                    TextNode("b", "mark"),
+                    TextNode(" ", TextType.TEXT),
+                    TextNode("c", TextType.BOLD),
+                ],
+            )
+        finally:
+            inline_markdown._INLINE_SPLITTERS.remove(split_mark)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,133 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
+
+import main
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_PATH = os.path.join(SRC_DIR, "main.py")
+
+# Total self import time, in microseconds, allowed for a `copy` cold start.
+COPY_IMPORT_BUDGET_US = 100_000
+
+
+def _import_times(stderr):
+    """Parse `-X importtime` output into {module: self_us}."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        if self_us.strip().isdigit():
+            times[name.strip()] = int(self_us)
+    return times
+
+
+class TestCLI(unittest.TestCase):
+    def test_import_has_no_side_effects(self):
+        self.assertTrue(callable(main.main))
+
+    def test_no_arguments_only_copies(self):
+        with mock.patch("copystatic.copy_static_to_public") as copy, \
+                mock.patch.object(main, "cmd_copy") as cmd_copy, \
+                mock.patch.object(main, "cmd_build") as cmd_build:
+            self.assertEqual(main.main([]), 0)
+        copy.assert_called_once_with("static", "public")
+        cmd_copy.assert_not_called()
+        cmd_build.assert_not_called()
+
+    def test_copy_cold_start(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            static = os.path.join(tmp, "static")
+            os.mkdir(static)
+            with open(os.path.join(static, "a.txt"), "w") as f:
+                f.write("a")
+            dest = os.path.join(tmp, "public")
+            proc = subprocess.run(
+                [sys.executable, "-X", "importtime", MAIN_PATH, "copy",
+                 "--static", static, "--dest", dest,
+                 "--cache-dir", os.path.join(tmp, "cache")],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            self.assertTrue(os.path.isfile(os.path.join(dest, "a.txt")))
+
+        times = _import_times(proc.stderr)
+        self.assertIn("copystatic", times)
+        for heavy in ("markdown_blocks", "inline_markdown", "textnode", "htmlnode"):
+            self.assertNotIn(heavy, times)
+        self.assertLess(sum(times.values()), COPY_IMPORT_BUDGET_US)
+
+    def test_render_skips_build_modules(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "w") as f:
+                f.write("# Hi")
+            for args in (["--help"], ["render", path]):
+                proc = subprocess.run(
+                    [sys.executable, "-X", "importtime", MAIN_PATH, *args],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+                times = _import_times(proc.stderr)
+                for heavy in ("build", "copystatic", "output", "publish"):
+                    self.assertNotIn(heavy, times, args)
+
+    def test_render(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "w") as f:
+                f.write("# Hi\n\nsome **bold**")
+            out = io.StringIO()
+            with redirect_stdout(out):
+                self.assertEqual(main.main(["render", path]), 0)
+        self.assertEqual(out.getvalue(), "<div><h1>Hi</h1><p>some <b>bold</b></p></div>\n")
+
+    def test_build(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            static = os.path.join(tmp, "static")
+            content = os.path.join(tmp, "content", "blog")
+            os.makedirs(static)
+            os.makedirs(content)
+            with open(os.path.join(content, "post.md"), "w") as f:
+                f.write("# Post\n\nbody   text")
+            with open(os.path.join(content, "wip.md"), "w") as f:
+                f.write("---\ndraft: true\n---\n# WIP")
+            template = os.path.join(tmp, "template.html")
+            with open(template, "w") as f:
+                f.write("<title>{{ Title }}</title>{{ Content }}")
+            dest = os.path.join(tmp, "public")
+            with redirect_stdout(io.StringIO()):
+                main.main(["build", "--static", static, "--content",
+                           os.path.join(tmp, "content"), "--template", template,
+                           "--dest", dest, "--minify",
+                           "--cache-dir", os.path.join(tmp, "cache")])
+            with open(os.path.join(dest, "blog", "post.html")) as f:
+                self.assertEqual(
+                    f.read(),
+                    "<title>Post</title><div><h1>Post</h1><p>body text</p></div>",
+                )
+            self.assertFalse(os.path.exists(os.path.join(dest, "blog", "wip.html")))
+
+            out = io.StringIO()
+            with redirect_stdout(out):
+                args = ["build", "--static", static, "--content",
+                        os.path.join(tmp, "content"), "--template", template,
+                        "--dest", dest, "--full", "--cache-dir", os.path.join(tmp, "cache")]
+                self.assertEqual(main.main(args + ["--mem-report"]), 0)
+                with redirect_stderr(io.StringIO()):
+                    self.assertEqual(
+                        main.main(args + ["--page-mem-budget", "0.000001", "--over-budget", "fail"]), 1
+                    )
+            self.assertIn("post.md", out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
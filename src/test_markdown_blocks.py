@@ -1,8 +1,15 @@
+import copy
 import unittest
+
+import markdown_blocks
+from htmlnode import ParentNode
+from inline_markdown import Definitions
 from markdown_blocks import (
     markdown_to_html_node,
     markdown_to_blocks,
     block_to_block_type,
+    register_block_type,
+    text_to_children,
     BlockType,
 )
 
@@ -164,5 +171,148 @@ the **same** even with inline stuff
         )
 
 
+class TestReferences(unittest.TestCase):
+    def test_reference_links_and_images(self):
+        md = """
+See [the docs][docs], [Boot Dev][] and [boot dev] but not [missing][nope].
+
+![logo][img]
+
+[docs]: https://example.com/docs
+[Boot   dev]: https://boot.dev "Title"
+[img]: /images/logo.png
+"""
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><p>See <a href="https://example.com/docs">the docs</a>, '
+            '<a href="https://boot.dev">Boot Dev</a> and <a href="https://boot.dev">boot dev</a> '
+            "but not [missing][nope].</p>"
+            '<p><img src="/images/logo.png" alt="logo"></img></p></div>',
+        )
+
+    def test_definitions_never_reach_paragraphs(self):
+        md = "Intro line\n[a]: https://a.example\nmore text [a]"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><p>Intro line more text <a href="https://a.example">a</a></p></div>',
+        )
+
+    def test_footnotes(self):
+        md = """
+Claim[^src] and another[^2].
+
+[^2]: Second **note**.
+[^src]: Source note.
+"""
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><p>Claim<sup><a href="#fn-src" id="fnref-src">2</a></sup> and another'
+            '<sup><a href="#fn-2" id="fnref-2">1</a></sup>.</p>'
+            '<section class="footnotes"><ol>'
+            '<li id="fn-2">Second <b>note</b>. <a href="#fnref-2">↩</a></li>'
+            '<li id="fn-src">Source note. <a href="#fnref-src">↩</a></li>'
+            "</ol></section></div>",
+        )
+
+    def test_repeated_footnote_references(self):
+        md = "One[^n] two[^n].\n\nThree[^n].\n\n[^n]: Note."
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><p>One<sup><a href="#fn-n" id="fnref-n">1</a></sup> two'
+            '<sup><a href="#fn-n" id="fnref-n-2">1</a></sup>.</p>'
+            '<p>Three<sup><a href="#fn-n" id="fnref-n-3">1</a></sup>.</p>'
+            '<section class="footnotes"><ol>'
+            '<li id="fn-n">Note. <a href="#fnref-n">↩</a></li>'
+            "</ol></section></div>",
+        )
+        parallel = markdown_to_html_node(md, workers=2, threshold=0)
+        self.assertEqual(parallel.to_html(), markdown_to_html_node(md).to_html())
+
+    def test_inline_code_is_not_a_reference(self):
+        md = "Use `arr[i]` or [i].\n\n[i]: https://i.example"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><p>Use <code>arr[i]</code> or <a href="https://i.example">i</a>.</p></div>',
+        )
+
+    def test_code_blocks_keep_definition_lines(self):
+        md = "```\n[a]: https://a.example\n```"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><pre><code>[a]: https://a.example\n</code></pre></div>",
+        )
+
+
+class TestBlockRegistry(unittest.TestCase):
+    def setUp(self):
+        self._detectors = copy.deepcopy(markdown_blocks._BLOCK_DETECTORS)
+        self._builders = dict(markdown_blocks._BLOCK_BUILDERS)
+
+    def tearDown(self):
+        markdown_blocks._BLOCK_DETECTORS = self._detectors
+        markdown_blocks._BLOCK_BUILDERS = self._builders
+
+    def test_builtin_edge_cases(self):
+        self.assertEqual(block_to_block_type("*emphasis* para"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("1990 was a year"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("```\nunclosed"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("* item"), BlockType.ULIST)
+
+    def test_register_custom_block(self):
+        def build_admonition(block):
+            kind, _, text = block[4:].partition("\n")
+            return ParentNode("aside", text_to_children(text.strip()), {"class": kind.strip()})
+
+        register_block_type("admonition", build_admonition, "!", lambda b: b.startswith("!!! "))
+        md = "!!! note\nBe **careful**\n\n!not an admonition"
+        self.assertEqual(block_to_block_type("!!! note\nx"), "admonition")
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><aside class="note">Be <b>careful</b></aside><p>!not an admonition</p></div>',
+        )
+
+
+class TestParallelRender(unittest.TestCase):
+    DOC = "\n\n".join(
+        [
+            "# Changelog",
+            "See [the docs][docs] and a note[^a].",
+            "```python\ndef f():\n    return 1\n```",
+        ]
+        + [f"- change **{i}**\n- fix _{i}_ [docs]" for i in range(60)]
+        + ["> quoted\n> text", "1. one\n2. two", "[docs]: /docs", "[^a]: A *note*."]
+    )
+
+    def test_matches_serial_render(self):
+        expected = markdown_to_html_node(self.DOC).to_html()
+        peaks = {}
+        node = markdown_to_html_node(self.DOC, workers=3, threshold=0, worker_peaks=peaks)
+        self.assertEqual(node.to_html(), expected)
+        self.assertTrue(peaks)
+        self.assertTrue(all(peak > 0 for peak in peaks.values()))
+
+    def test_chunk_peak_ignores_inherited_traces(self):
+        import tracemalloc
+
+        tracemalloc.start()
+        try:
+            held = bytearray(4 * 1024 * 1024)
+            _, _, peak = markdown_blocks._build_chunk((["# Small"], Definitions(), True))
+            self.assertLess(peak, len(held))
+        finally:
+            tracemalloc.stop()
+
+    def test_below_threshold_stays_serial(self):
+        peaks = {}
+        markdown_to_html_node(self.DOC, workers=3, worker_peaks=peaks)
+        self.assertEqual(peaks, {})
+
+    def test_chunks_keep_order(self):
+        blocks = ["a" * n for n in (5, 1, 1, 8, 2, 3)]
+        chunks = markdown_blocks._chunk_blocks(blocks, 3)
+        self.assertLessEqual(len(chunks), 3)
+        self.assertEqual([b for chunk in chunks for b in chunk], blocks)
+
+
 if __name__ == "__main__":
     unittest.main()
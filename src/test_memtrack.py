@@ -0,0 +1,49 @@
+import unittest
+
+from gencontent import render_page
+from memtrack import MemoryBudgetExceeded, MemoryTracker
+
+TEMPLATE = "{{ Title }}|{{ Content }}"
+DOC = "# Big\n\n" + "\n\n".join(f"Paragraph **{i}** with [a link](/p{i}.png)[^n]" for i in range(200)) + "\n\n[^n]: note"
+
+
+class TestMemoryTracker(unittest.TestCase):
+    def tearDown(self):
+        self.tracker.stop()
+
+    def test_records_peaks_and_report(self):
+        self.tracker = MemoryTracker()
+        render_page("# Small\n\ntext", TEMPLATE, memory=self.tracker, name="small.md")
+        render_page(DOC, TEMPLATE, memory=self.tracker, name="big.md")
+        self.assertEqual([page for page, _ in self.tracker.top(2)], ["big.md", "small.md"])
+        self.assertGreater(self.tracker.pages["big.md"], 0)
+        self.assertEqual(self.tracker.streamed, [])
+        self.assertGreaterEqual(self.tracker.peak, self.tracker.pages["big.md"])
+        report = self.tracker.report(1)
+        self.assertIn(f"Build process traced peak: {self.tracker.peak / 1024:.1f} KiB", report)
+        self.assertIn("big.md", report)
+        self.assertNotIn("small.md", report)
+
+    def test_fail_policy(self):
+        self.tracker = MemoryTracker(budget=1, policy="fail")
+        with self.assertRaises(MemoryBudgetExceeded):
+            render_page(DOC, TEMPLATE, memory=self.tracker, name="big.md")
+
+    def test_stream_fallback_matches_full_render(self):
+        self.tracker = MemoryTracker(budget=1)
+        for minify in (False, True):
+            expected_assets, assets = set(), set()
+            expected = render_page(DOC, TEMPLATE, minify, expected_assets)
+            streamed = render_page(DOC, TEMPLATE, minify, assets, self.tracker, "big.md")
+            self.assertEqual(streamed, expected)
+            self.assertEqual(assets, expected_assets)
+        self.assertEqual(self.tracker.streamed, ["big.md", "big.md"])
+
+    def test_unknown_policy(self):
+        self.tracker = MemoryTracker()
+        with self.assertRaises(ValueError):
+            MemoryTracker(policy="ignore")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from build import build_selection, build_site
+from output import OutputTree
+from publish import current_generation
+
+
+class TestOutputTree(unittest.TestCase):
+    def test_links_unchanged_and_diffs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            prev = os.path.join(tmp, "prev")
+            first = OutputTree(prev)
+            first.write_text(os.path.join(prev, "a.html"), "a")
+            first.write_text(os.path.join(prev, "b/b.html"), "b")
+            first.write_text(os.path.join(prev, "gone.html"), "x")
+            self.assertEqual(first.written, 3)
+
+            new = os.path.join(tmp, "new")
+            second = OutputTree(new, prev, first.manifest())
+            self.assertFalse(second.write_text(os.path.join(new, "a.html"), "a"))
+            self.assertTrue(second.write_text(os.path.join(new, "b/b.html"), "B"))
+            self.assertTrue(second.write_text(os.path.join(new, "c.html"), "c"))
+            self.assertEqual(
+                os.stat(os.path.join(prev, "a.html")).st_ino,
+                os.stat(os.path.join(new, "a.html")).st_ino,
+            )
+            self.assertEqual(
+                second.diff(),
+                {"added": ["c.html"], "changed": ["b/b.html"], "removed": ["gone.html"]},
+            )
+            with open(os.path.join(prev, "b/b.html")) as f:
+                self.assertEqual(f.read(), "b")
+
+    def test_in_place_skips_identical(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first = OutputTree(tmp)
+            path = os.path.join(tmp, "a.html")
+            first.write_text(path, "a")
+            os.utime(path, ns=(5, 5))
+            again = OutputTree(tmp, manifest=first.manifest(), in_place=True)
+            self.assertFalse(again.write_text(path, "a"))
+            self.assertEqual(os.stat(path).st_mtime_ns, 5)
+            self.assertEqual(again.diff(), {"added": [], "changed": [], "removed": []})
+
+
+class TestBuildWriteAvoidance(unittest.TestCase):
+    def _write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_rebuild_preserves_mtimes_and_reports_diff(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            static = os.path.join(tmp, "static")
+            content = os.path.join(tmp, "content")
+            template = os.path.join(tmp, "template.html")
+            dest = os.path.join(tmp, "public")
+            cache = os.path.join(tmp, "cache")
+            self._write(os.path.join(static, "index.css"), "css")
+            self._write(os.path.join(static, "old.txt"), "old")
+            self._write(os.path.join(content, "a.md"), "# A")
+            self._write(os.path.join(content, "b.md"), "# B")
+            self._write(template, "{{ Content }}")
+
+            def build(**kwargs):
+                with redirect_stdout(io.StringIO()):
+                    build_site(static, content, template, dest, cache_dir=cache, **kwargs).join()
+                with open(os.path.join(cache, "deploy-diff.json")) as f:
+                    return json.load(f)
+
+            diff = build()
+            self.assertEqual(diff["added"], ["a.html", "b.html", "index.css", "old.txt"])
+            css_mtime = os.stat(os.path.join(dest, "index.css")).st_mtime_ns
+            a_mtime = os.stat(os.path.join(dest, "a.html")).st_mtime_ns
+
+            os.remove(os.path.join(static, "old.txt"))
+            self._write(os.path.join(content, "b.md"), "# B2")
+            diff = build(full=True)
+            self.assertEqual(diff["added"], [])
+            self.assertEqual(diff["changed"], ["b.html"])
+            self.assertEqual(diff["removed"], ["old.txt"])
+            self.assertEqual(os.stat(os.path.join(dest, "index.css")).st_mtime_ns, css_mtime)
+            self.assertEqual(os.stat(os.path.join(dest, "a.html")).st_mtime_ns, a_mtime)
+
+            # A partial build keeps the live manifest in step with what it wrote
+            self._write(os.path.join(content, "a.md"), "# A2")
+            with redirect_stdout(io.StringIO()):
+                build_selection(["a.md"], static, content, template, dest, cache_dir=cache)
+            live = current_generation(dest)
+            self._write(os.path.join(content, "a.md"), "# A")
+            build(full=True)
+            with open(os.path.join(dest, "a.html")) as f:
+                self.assertEqual(f.read(), "<div><h1>A</h1></div>")
+            self.assertTrue(os.path.isfile(os.path.join(live, "a.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
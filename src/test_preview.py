@@ -0,0 +1,79 @@
+import io
+import os
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from contextlib import redirect_stdout
+
+from preview import make_server
+
+
+class TestPreview(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        tmp = self._tmp.name
+        self.static = os.path.join(tmp, "static")
+        self.content = os.path.join(tmp, "content")
+        os.makedirs(os.path.join(self.static, "images"))
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.template = os.path.join(tmp, "template.html")
+        self._write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self._write(os.path.join(self.static, "images", "a.png"), "PNG")
+        self._write(os.path.join(self.content, "index.md"), "# Home")
+        self.post = os.path.join(self.content, "blog", "post.md")
+        self._write(self.post, "---\ntitle: Post\n---\nhello")
+
+        self.server = make_server(self.static, self.content, self.template, port=0)
+        self.site = self.server.RequestHandlerClass.site
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._quiet = redirect_stdout(io.StringIO())
+        self._quiet.__enter__()
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+        self._quiet.__exit__(None, None, None)
+        self._tmp.cleanup()
+
+    def _write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def _get(self, path):
+        with urllib.request.urlopen(self.base + path) as resp:
+            return resp.headers["Content-Type"], resp.read().decode()
+
+    def test_pages_and_static(self):
+        self.assertEqual(
+            self._get("/"),
+            ("text/html; charset=utf-8", "<title>Home</title><div><h1>Home</h1></div>"),
+        )
+        self.assertEqual(self._get("/blog/post.html")[1], "<title>Post</title><div><p>hello</p></div>")
+        self.assertEqual(self._get("/blog/post")[1], "<title>Post</title><div><p>hello</p></div>")
+        self.assertEqual(self._get("/images/a.png"), ("image/png", "PNG"))
+
+    def test_not_found(self):
+        for path in ["/missing", "/../template.html", "/blog/post.md"]:
+            with self.assertRaises(urllib.error.HTTPError) as ctx:
+                self._get(path)
+            self.assertEqual(ctx.exception.code, 404)
+
+    def test_cache_and_invalidation(self):
+        self._get("/blog/post")
+        self._get("/blog/post")
+        self.assertEqual((self.site.cache.hits, self.site.cache.misses), (1, 1))
+        self.assertEqual(len(self.site.cache), 1)
+
+        self._write(self.post, "---\ntitle: Post\n---\nedited")
+        os.utime(self.post, ns=(1, 1))
+        self.assertEqual(self._get("/blog/post")[1], "<title>Post</title><div><p>edited</p></div>")
+        self.assertEqual(self.site.cache.misses, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from build import build_site
+from publish import (
+    begin_generation,
+    commit_generation,
+    current_generation,
+    list_generations,
+    rollback,
+)
+
+
+def _read(path):
+    with open(path) as f:
+        return f.read()
+
+
+class TestPublish(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        self.dest = os.path.join(self.tmp, "public")
+        self.out = io.StringIO()
+        self._redirect = redirect_stdout(self.out)
+        self._redirect.__enter__()
+
+    def tearDown(self):
+        self._redirect.__exit__(None, None, None)
+        self._tmp.cleanup()
+
+    def _publish(self, text, keep=2):
+        staging = begin_generation(self.dest)
+        os.mkdir(staging)
+        with open(os.path.join(staging, "index.html"), "w") as f:
+            f.write(text)
+        commit_generation(self.dest, staging, keep, background=False)
+        return staging
+
+    def test_swap_and_rollback(self):
+        first = self._publish("one")
+        second = self._publish("two")
+        self.assertTrue(os.path.islink(self.dest))
+        self.assertEqual(current_generation(self.dest), second)
+        self.assertEqual(_read(os.path.join(self.dest, "index.html")), "two")
+
+        self.assertEqual(rollback(self.dest), first)
+        self.assertEqual(_read(os.path.join(self.dest, "index.html")), "one")
+        with self.assertRaises(ValueError):
+            rollback(self.dest)
+
+    def test_prunes_old_generations(self):
+        for i in range(5):
+            live = self._publish(str(i), keep=2)
+        generations = list_generations(self.dest)
+        self.assertEqual(len(generations), 2)
+        self.assertEqual(generations[-1], live)
+
+    def test_background_prune(self):
+        self._publish("a")
+        staging = begin_generation(self.dest)
+        os.mkdir(staging)
+        thread = commit_generation(self.dest, staging, keep=1)
+        thread.join()
+        self.assertEqual(list_generations(self.dest), [staging])
+
+    def test_adopts_plain_directory(self):
+        os.mkdir(self.dest)
+        with open(os.path.join(self.dest, "old.html"), "w") as f:
+            f.write("old")
+        self._publish("new")
+        self.assertEqual(len(list_generations(self.dest)), 2)
+        rollback(self.dest)
+        self.assertEqual(_read(os.path.join(self.dest, "old.html")), "old")
+
+    def test_failed_build_leaves_site_untouched(self):
+        self._publish("live")
+        missing_static = os.path.join(self.tmp, "missing")
+        with self.assertRaises(FileNotFoundError):
+            build_site(missing_static, None, None, self.dest, pages=False)
+        self.assertEqual(_read(os.path.join(self.dest, "index.html")), "live")
+        self.assertEqual(len(list_generations(self.dest)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
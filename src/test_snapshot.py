@@ -0,0 +1,64 @@
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from markdown_blocks import markdown_to_html_node
+from snapshot import SnapshotError, dump_tree, load_tree
+
+
+class TestSnapshot(unittest.TestCase):
+    def test_round_trip_markdown(self):
+        md = """
+# Title with **bold**
+
+A paragraph with a [link](https://boot.dev) and ![img](/a.png)
+
+- one
+- two
+
+```python
+print("hi")
+```
+"""
+        node = markdown_to_html_node(md)
+        restored = load_tree(dump_tree(node))
+        self.assertEqual(restored.to_html(), node.to_html())
+        self.assertEqual(repr(restored), repr(node))
+
+    def test_round_trip_none_and_unicode(self):
+        node = ParentNode(
+            "p",
+            [LeafNode(None, "héllo ☃"), LeafNode("img", "", {"src": "x", "alt": ""})],
+            {"class": "x"},
+        )
+        restored = load_tree(dump_tree(node))
+        self.assertEqual(restored.to_html(), node.to_html())
+        self.assertIsNone(restored.children[0].tag)
+
+    def test_interns_strings(self):
+        node = ParentNode("ul", [LeafNode("li", "same") for _ in range(100)])
+        data = dump_tree(node)
+        self.assertEqual(data.count(b"same"), 1)
+
+    def test_deep_tree(self):
+        node = LeafNode("b", "x")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        restored = load_tree(dump_tree(node))
+        depth = 0
+        while isinstance(restored, ParentNode):
+            restored = restored.children[0]
+            depth += 1
+        self.assertEqual(depth, 5000)
+
+    def test_rejects_bad_input(self):
+        data = dump_tree(ParentNode("p", [LeafNode(None, "x")]))
+        with self.assertRaises(SnapshotError):
+            load_tree(b"nope" + data[4:])
+        with self.assertRaises(SnapshotError):
+            load_tree(data[:4] + b"\x09\x00\x00\x00" + data[8:])
+        with self.assertRaises(SnapshotError):
+            load_tree(data[:-12])
+
+
+if __name__ == "__main__":
+    unittest.main()
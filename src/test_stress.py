@@ -0,0 +1,40 @@
+import unittest
+
+from inline_markdown import split_nodes_link
+from stress import GENERATORS, check_generator, random_markdown, run_pipeline
+from textnode import TextNode, TextType
+
+
+class TestStress(unittest.TestCase):
+    def test_generators_scale_linearly(self):
+        for name in GENERATORS:
+            with self.subTest(name=name):
+                result = check_generator(name, small=2000, factor=8, timed=False)
+                self.assertTrue(
+                    result["calls_ok"],
+                    f"{name}: calls grew x{result['call_growth']:.1f} for x8 input",
+                )
+                self.assertTrue(
+                    result["memory_ok"],
+                    f"{name}: {result['memory_per_char']:.0f} bytes per input char",
+                )
+
+    def test_random_markdown_does_not_crash(self):
+        for seed in range(50):
+            text = random_markdown(500, seed)
+            result = run_pipeline(text)
+            self.assertTrue(result is None or result.startswith("<div>"))
+
+    def test_link_after_identical_image_markup(self):
+        node = TextNode("![a](b) then [a](b)", TextType.TEXT)
+        self.assertListEqual(
+            [
+                TextNode("![a](b) then ", TextType.TEXT),
+                TextNode("a", TextType.LINK, "b"),
+            ],
+            split_nodes_link([node]),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 
-from textnode import TextNode, TextType, text_node_to_html_node
+import textnode
+from htmlnode import LeafNode
+from textnode import TextNode, TextType, register_text_type, text_node_to_html_node
 
 
 class TestTextNode(unittest.TestCase):
@@ -54,6 +56,19 @@ class TestTextNodeToHTMLNode(unittest.TestCase):
         self.assertEqual(html_node.tag, "b")
         self.assertEqual(html_node.value, "This is bold")
 
+    def test_unknown_type(self):
+        with self.assertRaises(ValueError):
+            text_node_to_html_node(TextNode("x", "nope"))
+
+    def test_register_text_type(self):
+        register_text_type("mark", lambda node: LeafNode("mark", node.text))
+        try:
+            html_node = text_node_to_html_node(TextNode("hi", "mark"))
+            self.assertEqual(html_node.to_html(), "<mark>hi</mark>")
+            self.assertEqual(repr(TextNode("hi", "mark")), "TextNode(hi, mark, None)")
+        finally:
+            del textnode._TEXT_NODE_BUILDERS["mark"]
+
 
 if __name__ == "__main__":
     unittest.main()
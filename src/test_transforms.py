@@ -0,0 +1,86 @@
+import unittest
+
+from htmlnode import LeafNode, ParentNode, TransformPipeline
+from markdown_blocks import markdown_to_html_node
+from transforms import ExternalLinkRel, HeadingAnchors, ImageURLRewrite, TOCCollector
+
+
+class TestTransforms(unittest.TestCase):
+    def test_builtins_in_one_pass(self):
+        md = """
+# Intro **here**
+
+See [docs](https://example.com/docs) and [home](https://boot.dev/).
+
+![logo](/images/logo.png)
+
+## Intro here
+"""
+        toc = TOCCollector()
+        pipeline = TransformPipeline(
+            [
+                HeadingAnchors(),
+                ExternalLinkRel(site_hosts={"boot.dev"}),
+                ImageURLRewrite(lambda src: "https://cdn.example.com" + src),
+                toc,
+            ]
+        )
+        html = pipeline.apply(markdown_to_html_node(md)).to_html()
+        self.assertIn('<h1 id="intro-here">', html)
+        self.assertIn('<h2 id="intro-here-1">', html)
+        self.assertIn('<a href="https://example.com/docs" rel="noopener noreferrer">', html)
+        self.assertIn('<a href="https://boot.dev/">', html)
+        self.assertIn('src="https://cdn.example.com/images/logo.png"', html)
+        self.assertEqual(
+            toc.entries,
+            [(1, "intro-here", "Intro here"), (2, "intro-here-1", "Intro here")],
+        )
+        self.assertEqual(
+            set(pipeline.timings),
+            {"HeadingAnchors", "ExternalLinkRel", "ImageURLRewrite", "TOCCollector"},
+        )
+
+    def test_heading_ids_stay_unique(self):
+        tree = ParentNode(
+            "div",
+            [
+                LeafNode("h2", "b", {"id": "a-2"}),
+                LeafNode("h1", "a"),
+                LeafNode("h1", "a"),
+                LeafNode("h1", "a-1"),
+                LeafNode("h1", "a"),
+            ],
+        )
+        TransformPipeline([HeadingAnchors()]).apply(tree)
+        self.assertEqual(
+            [child.props["id"] for child in tree.children],
+            ["a-2", "a", "a-1", "a-1-1", "a-3"],
+        )
+
+    def test_malformed_link_is_skipped(self):
+        html = TransformPipeline([ExternalLinkRel()]).apply(
+            markdown_to_html_node("[x](http://[bad) and [y](https://y.example)")
+        ).to_html()
+        self.assertIn('<a href="http://[bad">x</a>', html)
+        self.assertIn('<a href="https://y.example" rel="noopener noreferrer">', html)
+
+    def test_function_transform_filters(self):
+        seen = []
+        pipeline = TransformPipeline()
+        pipeline.add(lambda n: seen.append(n.tag), tags={"b"}, name="bold")
+        pipeline.add(lambda n: seen.append("leaf"), node_types=[LeafNode], name="leaves")
+        tree = ParentNode("p", [LeafNode("b", "x"), LeafNode(None, "y")])
+        pipeline.apply(tree)
+        self.assertEqual(seen, ["b", "leaf", "leaf"])
+        self.assertIn("bold", pipeline.timings)
+
+    def test_unmatched_nodes_skip_visitors(self):
+        calls = []
+        pipeline = TransformPipeline()
+        pipeline.add(calls.append, tags={"img"})
+        pipeline.apply(ParentNode("div", [LeafNode("p", "x")] * 10))
+        self.assertEqual(calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
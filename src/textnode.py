@@ -1,4 +1,4 @@
-from htmlnode import LeafNode
+from htmlnode import LeafNode, ParentNode
 from enum import Enum
 
 
@@ -9,6 +9,7 @@ class TextType(Enum):
     CODE = "code"
     LINK = "link"
     IMAGE = "image"
+    FOOTNOTE = "footnote"
 
 
 class TextNode:
@@ -25,20 +26,40 @@ class TextNode:
         )
 
     def __repr__(self):
-        return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
+        text_type = getattr(self.text_type, "value", self.text_type)
+        return f"TextNode({self.text}, {text_type}, {self.url})"
+
+
+# text type -> builder(text_node) -> HTMLNode
+_TEXT_NODE_BUILDERS = {}
+
+
+def register_text_type(text_type, builder):
+    """
+    Register how TextNodes of `text_type` become HTML. `text_type` may be a
+    TextType or any other hashable identifier; `builder` takes the TextNode
+    and returns an HTMLNode.
+    """
+    _TEXT_NODE_BUILDERS[text_type] = builder
+
+
+register_text_type(TextType.TEXT, lambda node: LeafNode(None, node.text))
+register_text_type(TextType.BOLD, lambda node: LeafNode("b", node.text))
+register_text_type(TextType.ITALIC, lambda node: LeafNode("i", node.text))
+register_text_type(TextType.CODE, lambda node: LeafNode("code", node.text))
+register_text_type(TextType.LINK, lambda node: LeafNode("a", node.text, {"href": node.url}))
+register_text_type(TextType.IMAGE, lambda node: LeafNode("img", "", {"src": node.url, "alt": node.text}))
+# Footnote references carry their number as text and the footnote id as url
+register_text_type(
+    TextType.FOOTNOTE,
+    lambda node: ParentNode(
+        "sup", [LeafNode("a", node.text, {"href": f"#fn-{node.url}", "id": f"fnref-{node.url}"})]
+    ),
+)
 
 
 def text_node_to_html_node(text_node):
-    if text_node.text_type == TextType.TEXT:
-        return LeafNode(None, text_node.text)
-    if text_node.text_type == TextType.BOLD:
-        return LeafNode("b", text_node.text)
-    if text_node.text_type == TextType.ITALIC:
-        return LeafNode("i", text_node.text)
-    if text_node.text_type == TextType.CODE:
-        return LeafNode("code", text_node.text)
-    if text_node.text_type == TextType.LINK:
-        return LeafNode("a", text_node.text, {"href": text_node.url})
-    if text_node.text_type == TextType.IMAGE:
-        return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
-    raise ValueError(f"invalid text type: {text_node.text_type}")
+    builder = _TEXT_NODE_BUILDERS.get(text_node.text_type)
+    if builder is None:
+        raise ValueError(f"invalid text type: {text_node.text_type}")
+    return builder(text_node)
@@ -0,0 +1,162 @@
+"""
+Built-in tree transforms for use with htmlnode.TransformPipeline.
+"""
+
+import re
+from urllib.parse import urlparse
+
+from htmlnode import LeafNode, Transform
+
+HEADING_TAGS = frozenset({"h1", "h2", "h3", "h4", "h5", "h6"})
+
+_SLUG_STRIP = re.compile(r"[^\w\s-]")
+_SLUG_SPACE = re.compile(r"[\s_-]+")
+
+
+def node_text(node):
+    """Concatenate the text of every leaf under `node`."""
+    parts = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, LeafNode):
+            parts.append(current.value or "")
+        elif current.children:
+            stack.extend(reversed(current.children))
+    return "".join(parts)
+
+
+def slugify(text):
+    slug = _SLUG_STRIP.sub("", text.lower()).strip()
+    return _SLUG_SPACE.sub("-", slug) or "section"
+
+
+class HeadingAnchors(Transform):
+    """Gives every heading a unique `id` derived from its text."""
+
+    tags = HEADING_TAGS
+
+    def __init__(self):
+        # slug -> next suffix to try
+        self.seen = {}
+        # Every id handed out or already present on a heading
+        self.taken = set()
+
+    def visit(self, node):
+        props = node.props if node.props is not None else {}
+        if "id" in props:
+            self.taken.add(props["id"])
+        else:
+            slug = slugify(node_text(node))
+            count = self.seen.get(slug, 0)
+            anchor = slug if count == 0 else f"{slug}-{count}"
+            while anchor in self.taken:
+                count += 1
+                anchor = f"{slug}-{count}"
+            self.seen[slug] = count + 1
+            self.taken.add(anchor)
+            props["id"] = anchor
+        node.props = props
+
+
+class ExternalLinkRel(Transform):
+    """Adds a `rel` attribute to links pointing outside `site_hosts`."""
+
+    tags = frozenset({"a"})
+
+    def __init__(self, site_hosts=(), rel="noopener noreferrer"):
+        self.site_hosts = frozenset(site_hosts)
+        self.rel = rel
+
+    def visit(self, node):
+        href = (node.props or {}).get("href", "")
+        try:
+            host = urlparse(href).netloc
+        except ValueError:
+            # Malformed URLs such as "http://[bad" are left alone
+            return
+        if host and host not in self.site_hosts:
+            node.props.setdefault("rel", self.rel)
+
+
+class ImageURLRewrite(Transform):
+    """Rewrites image `src` attributes with `rewrite(src) -> src`."""
+
+    tags = frozenset({"img"})
+
+    def __init__(self, rewrite):
+        self.rewrite = rewrite
+
+    def visit(self, node):
+        if node.props and "src" in node.props:
+            node.props["src"] = self.rewrite(node.props["src"])
+
+
+class TOCCollector(Transform):
+    """
+    Collects `(level, id, text)` for each heading, in document order.
+    Register it after HeadingAnchors so the ids are already assigned.
+    """
+
+    tags = HEADING_TAGS
+
+    def __init__(self):
+        self.entries = []
+
+    def visit(self, node):
+        anchor = (node.props or {}).get("id")
+        self.entries.append((int(node.tag[1]), anchor, node_text(node)))
+
+
+class AssetCollector(Transform):
+    """Collects the URLs a tree references through `img src` and `a href`."""
+
+    tags = frozenset({"img", "a"})
+
+    def __init__(self):
+        self.urls = set()
+
+    def visit(self, node):
+        props = node.props or {}
+        url = props.get("src") if node.tag == "img" else props.get("href")
+        if url:
+            self.urls.add(url)
+
+
+_MARKUP_TAG_PATTERN = re.compile(r"<([a-zA-Z][\w-]*)([^>]*)>")
+_MARKUP_ATTR_PATTERN = re.compile(r"""\b(class|id)\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.IGNORECASE)
+
+
+class UsageCollector(Transform):
+    """
+    Collects the tag names, classes and ids used in a tree, including in
+    raw markup held by leaf values (such as highlighted code), for
+    matching against CSS selectors.
+    """
+
+    def __init__(self):
+        self.tag_names = set()
+        self.classes = set()
+        self.ids = set()
+
+    def visit(self, node):
+        if node.tag:
+            self.tag_names.add(node.tag.lower())
+        props = node.props or {}
+        if props.get("class"):
+            self.classes.update(props["class"].split())
+        if props.get("id"):
+            self.ids.add(props["id"])
+        if isinstance(node, LeafNode) and node.value and "<" in node.value:
+            self.scan(node.value)
+
+    def scan(self, markup):
+        """Add the names used by the tags in an HTML string."""
+        for tag, attrs in _MARKUP_TAG_PATTERN.findall(markup):
+            self.tag_names.add(tag.lower())
+            for name, double, single in _MARKUP_ATTR_PATTERN.findall(attrs):
+                value = double or single
+                if name.lower() == "class":
+                    self.classes.update(value.split())
+                elif value:
+                    self.ids.add(value)